@@ -1,10 +1,15 @@
 import streamlit as st
 import time
 import pandas as pd
-import random
+from collections import deque
 from src.simulation.hospital_env import Hospital, Patient
 from src.agent.allocator import HospitalAgent
 from src.simulation.generator import generate_random_patient_features
+from src.simulation.rng import RandomStreams
+from src.simulation.metrics import SimulationMetrics
+
+# Only the latest patients are kept for the log table, totals come from the metrics
+RECENT_PATIENTS = 500
 
 st.set_page_config(page_title="Hospital AI Simulator", layout="wide")
 
@@ -18,17 +23,25 @@ if 'day' not in st.session_state:
 if 'simulation_running' not in st.session_state:
     st.session_state.simulation_running = False
 if 'patient_history' not in st.session_state:
-    st.session_state.patient_history = []
+    st.session_state.patient_history = deque(maxlen=RECENT_PATIENTS)
 if 'stats_history' not in st.session_state:
     st.session_state.stats_history = []
 if 'patient_counter' not in st.session_state:
     st.session_state.patient_counter = 0
+if 'streams' not in st.session_state:
+    st.session_state.streams = None
+if 'metrics' not in st.session_state:
+    st.session_state.metrics = None
 
-def reset_simulation(icu_beds, gen_beds):
-    st.session_state.hospital = Hospital(total_icu=icu_beds, total_general=gen_beds)
+def reset_simulation(icu_beds, gen_beds, seed):
+    st.session_state.streams = RandomStreams(seed)
+    st.session_state.metrics = SimulationMetrics()
+    st.session_state.hospital = Hospital(total_icu=icu_beds, total_general=gen_beds,
+                                         streams=st.session_state.streams,
+                                         metrics=st.session_state.metrics)
     st.session_state.agent = HospitalAgent(model_dir='src/models/')
     st.session_state.day = 0
-    st.session_state.patient_history = []
+    st.session_state.patient_history = deque(maxlen=RECENT_PATIENTS)
     st.session_state.stats_history = []
     st.session_state.patient_counter = 0
 
@@ -46,6 +59,7 @@ with st.sidebar:
     
     st.subheader("Scenario")
     max_patients = st.slider("Max Arrivals / Day", 5, 50, 20)
+    seed = st.number_input("Random Seed", min_value=0, value=42, help="Same seed and settings replay the same run")
     
     st.divider()
 
@@ -53,7 +67,7 @@ with st.sidebar:
     with col1:
         if st.button("▶ Start", type="primary"):
             if st.session_state.hospital is None:
-                reset_simulation(icu_beds, gen_beds)
+                reset_simulation(icu_beds, gen_beds, seed)
             st.session_state.simulation_running = True
     
     with col2:
@@ -61,7 +75,7 @@ with st.sidebar:
             st.session_state.simulation_running = False
 
     if st.button("🔄 Reset Simulation"):
-        reset_simulation(icu_beds, gen_beds)
+        reset_simulation(icu_beds, gen_beds, seed)
         st.session_state.simulation_running = False
         st.rerun()
 
@@ -112,11 +126,12 @@ if st.session_state.simulation_running:
     st.session_state.hospital.simulate_day(verbose=False)
 
     # 2. New Arrivals
-    new_patients_count = random.randint(1, max_patients)
+    streams = st.session_state.streams
+    new_patients_count = int(streams.arrivals(st.session_state.day).integers(1, max_patients + 1))
     for _ in range(new_patients_count):
         st.session_state.patient_counter += 1
         p_id = st.session_state.patient_counter
-        features = generate_random_patient_features()
+        features = generate_random_patient_features(streams.vitals(p_id))
         
         # AI Prediction
         pred_urgency, pred_los = st.session_state.agent.predictor(features)
@@ -124,6 +139,7 @@ if st.session_state.simulation_running:
         
         # Bed Allocation
         action = st.session_state.agent.allocate_resources(new_patient, st.session_state.hospital)
+        st.session_state.metrics.record_arrival(new_patient)
         
         # Structure Data for Table
         urgency_map = {0: "Critical", 1: "Low", 2: "Medium"}
@@ -138,9 +154,10 @@ if st.session_state.simulation_running:
             "Action": action,
             "Outcome": "Admitted" if "Refused" not in action else "Refused"
         }
-        st.session_state.patient_history.insert(0, patient_record) # Add to top
+        st.session_state.patient_history.appendleft(patient_record) # Add to top
 
     # 3. Update Stats History
+    st.session_state.metrics.record_occupancy(st.session_state.hospital)
     current_status = st.session_state.hospital.get_status()
     st.session_state.stats_history.append({
         "Day": st.session_state.day,
@@ -163,7 +180,7 @@ with tab1:
         st.line_chart(df_hist, x="Day", y=["ICU_Occupied", "General_Occupied"])
 
 with tab2:
-    st.subheader("Patient Admission Log (Latest First)")
+    st.subheader(f"Patient Admission Log (Latest {RECENT_PATIENTS}, Newest First)")
     if st.session_state.patient_history:
         df_patients = pd.DataFrame(st.session_state.patient_history)
         
@@ -183,16 +200,17 @@ with tab2:
         )
 
 with tab3:
+    metrics = st.session_state.metrics
     if not st.session_state.patient_history:
         st.info("Run the simulation to generate a report.")
     else:
         st.subheader("🏥 Post-Simulation Analysis Report")
-        df = pd.DataFrame(st.session_state.patient_history)
+        outcomes = pd.DataFrame(metrics.outcome_table()).T # rows: urgency, columns: outcome
         
         # --- 1. KEY METRICS ---
-        total_patients = len(df)
-        total_admitted = len(df[df['Outcome'] == 'Admitted'])
-        total_refused = len(df[df['Outcome'] == 'Refused'])
+        total_patients = int(metrics.complaints.sum())
+        total_admitted = int(outcomes['Admitted'].sum())
+        total_refused = int(outcomes['Refused'].sum())
         admission_rate = (total_admitted / total_patients) * 100
         
         c1, c2, c3, c4 = st.columns(4)
@@ -200,6 +218,13 @@ with tab3:
         c2.metric("Admitted", total_admitted)
         c3.metric("Refused", total_refused, delta_color="inverse")
         c4.metric("Admission Rate", f"{admission_rate:.1f}%")
+
+        los = metrics.los.summary()
+        l1, l2, l3, l4 = st.columns(4)
+        l1.metric("Patients Left", los['count'])
+        l2.metric("Mean Stay", f"{los['mean']:.1f} days")
+        l3.metric("Median Stay", f"{los['p50']:.1f} days")
+        l4.metric("90th Pct Stay", f"{los['p90']:.1f} days")
         
         st.divider()
         
@@ -208,28 +233,28 @@ with tab3:
         
         with c_chart1:
             st.markdown("#### Complaint Distribution")
-            complaint_counts = df['Complaint'].value_counts()
-            st.bar_chart(complaint_counts)
+            complaint_counts = pd.Series(metrics.complaint_counts())
+            st.bar_chart(complaint_counts[complaint_counts > 0])
             
         with c_chart2:
             st.markdown("#### Urgency Breakdown")
             # Urgency Distribution
-            urgency_counts = df['AI Urgency'].value_counts()
+            urgency_counts = outcomes['Admitted'] + outcomes['Refused']
             st.bar_chart(urgency_counts, color="#FF4B4B") # Red theme
 
         # --- 3. OUTCOMES ---
         st.divider()
         st.markdown("#### Outcomes by Urgency")
         
-        # Pivot table for Admitted vs Refused by Urgency
-        outcome_pivot = df.groupby(['AI Urgency', 'Outcome']).size().unstack(fill_value=0)
-        st.bar_chart(outcome_pivot)
+        # Admitted vs Refused (and how admitted patients left) by Urgency
+        st.bar_chart(outcomes)
 
         # --- 4. DOWNLOAD ---
         st.divider()
+        df = pd.DataFrame(st.session_state.patient_history)
         csv = df.to_csv(index=False).encode('utf-8')
         st.download_button(
-            "📥 Download Full Patient Report (CSV)",
+            f"📥 Download Latest {RECENT_PATIENTS} Patients (CSV)",
             data=csv,
             file_name="simulation_report.csv",
             mime="text/csv"
@@ -0,0 +1,67 @@
+# benchmarks/import_time.py
+#
+# Cold start cost: each case runs in a fresh interpreter, timed from process
+# start to the end of the snippet, and reports which heavy packages got imported.
+# The runtime case needs src/models/runtime.npz (python -m src.agent.runtime).
+#
+# Run from the repository root:
+#     python -m benchmarks.import_time
+
+import os
+import subprocess
+import sys
+import time
+
+HEAVY = ('sklearn', 'pandas', 'joblib', 'scipy')
+
+CASES = {
+    "python (empty)": "pass",
+    "import numpy": "import numpy",
+    "import hospital_env": "import src.simulation.hospital_env",
+    "import allocator": "import src.agent.allocator",
+    "import main": "import main",
+    "agent (.pkl, sklearn)": "from src.agent.allocator import HospitalAgent; HospitalAgent(runtime=False)",
+    "agent (runtime.npz)": "from src.agent.allocator import HospitalAgent; HospitalAgent(runtime=True)",
+    "agent (runtime) + predict": (
+        "from src.agent.allocator import HospitalAgent\n"
+        "from src.simulation.generator import generate_random_patient_features\n"
+        "HospitalAgent(runtime=True).predictor(generate_random_patient_features())"
+    ),
+}
+
+REPORT = (
+    "\nimport sys\n"
+    f"print(','.join(m for m in {HEAVY!r} if m in sys.modules))"
+)
+
+
+def run(snippet, repeats):
+    """
+    Median wall time (ms) of a fresh interpreter running the snippet, and the heavy modules it imported
+    """
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = subprocess.run([sys.executable, "-W", "ignore", "-c", snippet + REPORT],
+                                capture_output=True, text=True, cwd=os.getcwd())
+        times.append((time.perf_counter() - start) * 1e3)
+
+    if result.returncode != 0:
+        return None, result.stderr.strip().splitlines()[-1]
+
+    times.sort()
+    return times[len(times) // 2], result.stdout.strip() or "-"
+
+
+def main(repeats=5):
+    print(f"{'Case':<28}{'median ms':>10}  heavy modules imported")
+    for name, snippet in CASES.items():
+        ms, modules = run(snippet, repeats)
+        if ms is None:
+            print(f"{name:<28}{'failed':>10}  {modules}")
+        else:
+            print(f"{name:<28}{ms:>10.0f}  {modules}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
@@ -0,0 +1,46 @@
+# benchmarks/online_los_drift.py
+#
+# Checks that online LOS learning does not drift towards ever shorter stays.
+# A long run with ample beds feeds the online model, then a fixed set of
+# sampled patients is predicted before and after. Exits with status 1 if the
+# mean predicted LOS shrank by more than the tolerance, or a prediction fell
+# below MIN_LOS.
+#
+# Run from the repository root:
+#     python -m benchmarks.online_los_drift
+#     python -m benchmarks.online_los_drift 400   # days
+
+import sys
+
+import numpy as np
+
+from src.agent.allocator import HospitalAgent
+from src.agent.online_los import MIN_LOS
+from src.simulation.generator import sample_patient_features
+from src.simulation.hospital_env import COMPLAINTS
+from src.simulation.runner import make_scenario, run_scenario
+
+TOLERANCE = 0.05 # allowed relative drop of the mean predicted LOS
+
+
+def main(days=100, n_patients=2000, seed=0):
+    agent = HospitalAgent()
+
+    rng = np.random.default_rng(seed)
+    X = sample_patient_features(rng.integers(0, len(COMPLAINTS), n_patients), rng)
+    before = agent.predict_batch(X)[1]
+
+    run_scenario(make_scenario(days=days, online_los=True, total_icu=100, total_general=400), agent, seed)
+    after = agent.predict_batch(X)[1]
+
+    print(f"Departures learned: {agent.online_los.samples_seen} over {days} days")
+    print(f"Mean predicted LOS: {before.mean():.2f} -> {after.mean():.2f} days "
+          f"(min {after.min():.2f})")
+
+    ok = after.mean() >= before.mean() * (1 - TOLERANCE) and after.min() >= MIN_LOS
+    print("OK" if ok else "FAILED: online LOS drifted down")
+    return ok
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main(int(sys.argv[1]) if len(sys.argv) > 1 else 100) else 1)
@@ -0,0 +1,86 @@
+# benchmarks/patient_memory.py
+#
+# Compares the memory held per patient by the compact Patient class against
+# the previous dict based implementation (copied below as LegacyPatient).
+#
+# Run from the repository root:
+#     python -m benchmarks.patient_memory
+
+import gc
+import sys
+import tracemalloc
+
+import numpy as np
+
+from src.simulation.hospital_env import Patient, encode_features, FEATURE_ORDER
+from src.simulation.generator import generate_random_patient_features
+
+
+class LegacyPatient:
+    """
+    The Patient class as it was before __slots__ / numeric features.
+    """
+    def __init__(self, patient_id, features, predicted_los, predicted_urgency):
+        self.id = patient_id
+        self.features = features
+
+        self.expected_los = predicted_los
+        self.urgency_label = predicted_urgency
+
+        self.days_stayed = 0
+        self.assigned_bed_type = None
+
+        if predicted_urgency == 0:
+            self.current_state = "Critical"
+        elif predicted_urgency == 2:
+            self.current_state = "stable"
+        else:
+            self.current_state = "Stable"
+
+
+def measure(build, n):
+    """
+    Returns the bytes allocated per patient while building n patients.
+    """
+    gc.collect()
+    tracemalloc.start()
+    patients = build(n)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del patients
+    return current / n
+
+
+def main(n=100_000):
+    # Inputs are generated up front so only the patient objects are measured
+    raw = [generate_random_patient_features() for _ in range(n)]
+    los = np.random.uniform(1, 12, n)
+    urgency = np.random.randint(0, 3, n)
+
+    # The legacy patient kept the generator's dict, so copy it per patient
+    def legacy(n):
+        return [LegacyPatient(i, dict(raw[i]), los[i], urgency[i]) for i in range(n)]
+
+    def compact(n):
+        return [Patient(i, raw[i], los[i], urgency[i]) for i in range(n)]
+
+    matrix = np.stack([encode_features(f) for f in raw])
+
+    def shared(n):
+        return [Patient(i, matrix[i], los[i], urgency[i]) for i in range(n)]
+
+    results = {
+        "LegacyPatient (dict features)": measure(legacy, n),
+        "Patient (own feature row)": measure(compact, n),
+        "Patient (view into shared matrix)": measure(shared, n),
+    }
+
+    print(f"Patients: {n}  (features: {', '.join(FEATURE_ORDER)})")
+    print(f"Shared matrix: {matrix.nbytes / n:.0f} bytes/patient (held once)")
+    baseline = results["LegacyPatient (dict features)"]
+    for name, per_patient in results.items():
+        print(f"{name:<36} {per_patient:8.0f} bytes/patient  ({per_patient / baseline:.0%})")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -1,26 +1,37 @@
 # main.py
 
-import random
 import time
-import pandas as pd
-import numpy as np
 
 from src.simulation.hospital_env import Hospital, Patient
 from src.agent.allocator import HospitalAgent
 from src.simulation.generator import generate_random_patient_features
+from src.simulation.rng import RandomStreams
+from src.simulation.metrics import SimulationMetrics
 
 
 
-def run_simulation(days, max_patients_per_day):
+def run_simulation(days, max_patients_per_day, seed=None, replication=0, online_los=False):
     print("------------------------------------------------")
     print("INITIALIZING HOSPITAL AI SYSTEM")
     print("------------------------------------------------")
 
+    # Every draw comes from a stream of this master seed, so the run can be replayed
+    streams = RandomStreams(seed, replication)
+    print(f"Seed: {streams.seed} (replication {streams.replication})")
+
+    # Constant memory run summary (LOS, occupancy, outcomes per urgency)
+    metrics = SimulationMetrics()
+
     # Setup of hospital Environment
-    hospital = Hospital(total_icu=15, total_general=40) 
+    hospital = Hospital(total_icu=15, total_general=40, streams=streams, metrics=metrics) 
     
     agent = HospitalAgent(model_dir='src/models/') # Loads .pkl files
 
+    if online_los:
+        # LOS predictions keep learning from actual stays (snapshots go to data/online/los_online.pkl)
+        agent.enable_online_los(resume=True)
+        hospital.on_departure = agent.observe_departure
+
     patient_counter = 0
 
     for day in range(1, days + 1):
@@ -28,7 +39,7 @@ def run_simulation(days, max_patients_per_day):
         
         hospital.simulate_day()
         
-        new_patients_per_day = random.randint(1, max_patients_per_day)
+        new_patients_per_day = int(streams.arrivals(day).integers(1, max_patients_per_day + 1))
 
         print(f"\n--- New Arrivals ({new_patients_per_day}) ---")
 
@@ -36,19 +47,22 @@ def run_simulation(days, max_patients_per_day):
         for _ in range(new_patients_per_day):
             patient_counter += 1
             
-            features = generate_random_patient_features()
+            features = generate_random_patient_features(streams.vitals(patient_counter))
             
             pred_urgency, pred_los = agent.predictor(features)
             
             new_patient = Patient(patient_counter, features, pred_los, pred_urgency)
             
             action = agent.allocate_resources(new_patient, hospital)
+            metrics.record_arrival(new_patient)
             
             urgency_map = {0: "Critical", 1: "Low", 2: "Medium"}
             urgency_text = urgency_map.get(pred_urgency, "Unknown")
             
             print(f"Patient {patient_counter} ({features['Complaint']}) -> AI: {urgency_text} -> Action: {action}")
 
+        metrics.record_occupancy(hospital)
+
         status = hospital.get_status()
         print(f"\n--- Bed Status ---")
         print(f"[ICU]: {status['ICU_Free']} free")
@@ -57,15 +71,27 @@ def run_simulation(days, max_patients_per_day):
         
         time.sleep(0.5)
 
+    if online_los:
+        agent.online_los.update()
+        agent.online_los.snapshot()
+
     print("\n------------------------------------------------")
     print("SIMULATION COMPLETE")
     print(f"Total Admitted: {hospital.stats['admitted']}")
     print(f"Total Deceased: {hospital.stats['deceased']}")
     print(f"Total Discharged: {hospital.stats['discharged']}")
+
+    los = metrics.los.summary()
+    print(f"Length of Stay: mean {los['mean']:.1f} days, median {los['p50']:.1f}, p90 {los['p90']:.1f}")
+    for bed_type, occupancy in metrics.summary()["occupancy"].items():
+        print(f"{bed_type} Occupancy: mean {occupancy['mean']:.1f}, p90 {occupancy['p90']:.0f}, max {occupancy['max']:.0f}")
+    for urgency, outcomes in metrics.outcome_table().items():
+        print(f"{urgency}: " + ", ".join(f"{outcome} {count}" for outcome, count in outcomes.items()))
     print("------------------------------------------------")
 
 if __name__ == "__main__":
 
     max_patients_per_day = input("Enter the number of new patients arriving each day (e.g., 20): ")
+    seed = input("Enter a seed to replay a run (leave empty for a random one): ")
 
-    run_simulation(days=50, max_patients_per_day=int(max_patients_per_day))
\ No newline at end of file
+    run_simulation(days=50, max_patients_per_day=int(max_patients_per_day), seed=int(seed) if seed.strip() else None)
\ No newline at end of file
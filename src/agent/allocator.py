@@ -1,17 +1,48 @@
-import joblib
-import pandas as pd
 import numpy as np
 import os
 
+from src.simulation.hospital_env import BedType, State, COMPLAINTS, encode_features
+from src.simulation.resources import Resource
+
+# Bed types tried in order for Critical (0) and Medium (2) patients, with the action reported
+ADMISSION_ORDER = {
+    0: ((BedType.ICU, "Assigned ICU (Critical)"),
+        (BedType.STEP_DOWN, "Assigned Step-Down (ICU Overflow)"),
+        (BedType.GENERAL, "Assigned General (ICU Overflow)")),
+    2: ((BedType.GENERAL, "Assigned General (Medium)"),
+        (BedType.STEP_DOWN, "Assigned Step-Down (General Overflow)")),
+}
+
+BED_RESOURCES = (Resource.ICU_BED, Resource.GENERAL_BED, Resource.STEP_DOWN_BED)
+
+# Snapshots of the online LOS correction. Kept out of model_dir: the result
+# cache keys on the files there, and sweeps never read the snapshot.
+ONLINE_LOS_SNAPSHOT = 'data/online/los_online.pkl'
+
 class HospitalAgent:
-    def __init__(self, model_dir='src/models/'):
+    def __init__(self, model_dir='src/models/', runtime='auto'):
+        """
+        :param runtime: True loads the numpy-only models from runtime.npz (see src/agent/runtime.py),
+                        False the scikit-learn .pkl files, 'auto' runtime.npz if it is up to date
+        """
         self.model_dir = model_dir
         
         self.feature_order = ['Age', 'Gender', 'Complaint_Code', 'HR', 'BP', 'Temp', 'SpO2']
+
+        self.online_los = None # see enable_online_los
         
-        self.load_models()
+        if runtime == 'auto':
+            from src.agent.runtime import runtime_is_current
+            runtime = runtime_is_current(model_dir)
+
+        if runtime:
+            self.load_runtime()
+        else:
+            self.load_models()
 
     def load_models(self):
+        import joblib # only needed for the .pkl path
+
         try:
             self.triage_model = joblib.load(os.path.join(self.model_dir, 'triage.pkl'))
             self.los_model = joblib.load(os.path.join(self.model_dir, 'los.pkl'))
@@ -21,61 +52,145 @@ class HospitalAgent:
         except FileNotFoundError as e:
             print(f"CRITICAL ERROR: {e}")
             print("Run 'triage_analysis.ipynb' again to generate the missing .pkl files.")
+            return
+
+        # Features are encoded with COMPLAINTS (see encode_features), the models were trained with this encoder
+        if tuple(self.encoder_complaint.classes_) != COMPLAINTS:
+            raise ValueError(f"encoder_complaint.pkl classes {list(self.encoder_complaint.classes_)} "
+                             f"do not match COMPLAINTS {list(COMPLAINTS)}")
+
+    def load_runtime(self):
+        """
+        Loads the exported parameter arrays, without scikit-learn
+        """
+        from src.agent.runtime import RuntimeModels, RUNTIME_FILE
+
+        models = RuntimeModels(os.path.join(self.model_dir, RUNTIME_FILE))
+        self.triage_model = models.triage_model
+        self.los_model = models.los_model
+        self.scaler = models.scaler
 
     def predictor(self, features):
         """
         Input: Dictionary (e.g., {'Age': 20, 'Complaint': 'Flu'...})
         Output: urgency_level (int), los (float)
         """
-        # Converting Dictionary to DataFrame
-        df = pd.DataFrame([features])
-
-        try:
-            # Check if valid complaint
-            if df['Complaint'].iloc[0] in self.encoder_complaint.classes_:
-                df['Complaint_Code'] = self.encoder_complaint.transform(df['Complaint'])
-            else:
-                df['Complaint_Code'] = 0 # Default to 0 if unknown
-        except:
-             df['Complaint_Code'] = 0
-
-        X_raw = df[self.feature_order]
+        # Feature row in feature_order, unknown complaints are encoded as 0
+        X_raw = encode_features(features, dtype=np.float64)[None, :]
 
-        X_scaled = self.scaler.transform(X_raw)
+        X_scaled = (X_raw - self.scaler.mean_) / self.scaler.scale_
 
         urgency_pred = self.triage_model.predict(X_scaled)[0]
         
-        los_pred = self.los_model.predict(X_scaled)[0]
+        if self.online_los is not None:
+            los_pred = self.online_los.predict(X_scaled)[0]
+        else:
+            los_pred = self.los_model.predict(X_scaled)[0]
+
+        return urgency_pred, los_pred
+
+    def predict_batch(self, X_raw):
+        """
+        Input: feature matrix (n, 7) in feature_order, complaints already encoded
+        Output: urgency_levels (int array), los (float array)
+        """
+        X_scaled = (np.asarray(X_raw, dtype=np.float64) - self.scaler.mean_) / self.scaler.scale_
+
+        urgency_pred = self.triage_model.predict(X_scaled)
+
+        if self.online_los is not None:
+            los_pred = self.online_los.predict(X_scaled)
+        else:
+            los_pred = self.los_model.predict(X_scaled)
 
         return urgency_pred, los_pred
 
+    def enable_online_los(self, resume=False, **kwargs):
+        """
+        Switches LOS prediction to an OnlineLOSModel that keeps learning from
+        departures. Connect it with: hospital.on_departure = agent.observe_departure
+        :param resume: start from the last snapshot (if there is one)
+        :param kwargs: passed to OnlineLOSModel (batch_size, min_samples, snapshot_every...)
+        """
+        from src.agent.online_los import OnlineLOSModel
+
+        kwargs.setdefault('snapshot_path', ONLINE_LOS_SNAPSHOT)
+        self.online_los = OnlineLOSModel(self.los_model, n_features=len(self.feature_order), **kwargs)
+
+        if resume and self.online_los.snapshot_path and os.path.exists(self.online_los.snapshot_path):
+            self.online_los.restore()
+
+        return self.online_los
+
+    def observe_departure(self, patient):
+        """
+        Feeds the stay of a discharged or deceased patient to the online LOS model.
+        Discharges forced at the predicted LOS (Patient.tick) are censored stays.
+        """
+        if self.online_los is None:
+            return
+
+        censored = patient.current_state == State.DISCHARGED and patient.days_stayed >= patient.expected_los
+        x_scaled = (patient.features - self.scaler.mean_) / self.scaler.scale_
+        self.online_los.observe(x_scaled, patient.days_stayed, censored)
+
     def allocate_resources(self, patient, hospital):
         urgency = patient.urgency_label
         
         # Decoding the LabelEncoder Logic
         # Based on your files: 0=Critical, 2=Medium, 1=Low
-        
-        if urgency == 0: # Critical
-            if hospital.admit_patient(patient, "ICU"):
-                return "Assigned ICU (Critical)"
-            elif hospital.admit_patient(patient, "GENERAL"):
-                return "Assigned General (ICU Overflow)"
-            else:
-                return "Refused (No Beds)"
-        
-        elif urgency == 2: # Medium
-             if hospital.admit_patient(patient, "GENERAL"):
-                return "Assigned General (Medium)"
-             else:
-                return "Refused (No Beds)"
+
+        if urgency in ADMISSION_ORDER:
+            for bed_type, action in ADMISSION_ORDER[urgency]:
+                if hospital.capacity[bed_type] == 0: # ward this hospital does not have
+                    continue
+                if hospital.admit_patient(patient, bed_type, count_refusal=False):
+                    return action
+            hospital.refuse_patient(patient)
+            return "Refused (No Beds)"
 
         elif urgency == 1: # Low
             # Only admit low priority if we have > 10% buffer
-            buffer = hospital.capacity["GENERAL"] * 0.1
-            if (hospital.capacity["GENERAL"] - len(hospital.occupied["GENERAL"])) > buffer:
-                hospital.admit_patient(patient, "GENERAL")
+            buffer = hospital.capacity[BedType.GENERAL] * 0.1
+            if hospital.free(Resource.GENERAL_BED) > buffer and hospital.admit_patient(patient, BedType.GENERAL):
                 return "Assigned General (Low Priority)"
             else:
                 return "Refused (Save Beds for Critical)"
         
-        return "Error in Allocation Logic"
\ No newline at end of file
+        return "Error in Allocation Logic"
+
+    def allocate_batch(self, patients, hospital):
+        """
+        Allocates a list of patients in order, with the same decisions as
+        allocate_resources on each of them. Runs of patients whose first
+        choice fits are admitted together (Hospital.admit_batch); a patient
+        that ends a run (first choice full, or Low urgency) goes through
+        allocate_resources. Returns the action of every patient.
+        """
+        # First ward this hospital has for each urgency in ADMISSION_ORDER
+        first_choice = {
+            urgency: next(((bed_type, action) for bed_type, action in options
+                           if hospital.capacity[bed_type] != 0), None)
+            for urgency, options in ADMISSION_ORDER.items()
+        }
+        choices = [first_choice.get(patient.urgency_label) for patient in patients]
+
+        actions = []
+        i = 0
+        while i < len(patients):
+            # A run can not admit more patients than there are free beds
+            free_beds = sum(hospital.free(resource) for resource in BED_RESOURCES)
+            end = i
+            while end < len(patients) and end <= i + free_beds and choices[end] is not None:
+                end += 1
+
+            bed_types = np.fromiter((choices[j][0] for j in range(i, end)), dtype=np.int64, count=end - i)
+            admitted = hospital.admit_batch(patients[i:end], bed_types)
+            actions.extend(choices[j][1] for j in range(i, i + admitted))
+            i += admitted
+
+            if i < len(patients) and (i < end or choices[i] is None):
+                actions.append(self.allocate_resources(patients[i], hospital))
+                i += 1
+
+        return actions
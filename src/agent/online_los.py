@@ -0,0 +1,146 @@
+import os
+
+import joblib
+import numpy as np
+
+# Shortest stay the model predicts: a patient is admitted for at least a day
+MIN_LOS = 1.0
+
+
+class OnlineLOSModel:
+    """
+    Incrementally updated correction on top of the trained LOS model.
+
+    The trained model (los.pkl) stays frozen; a linear model learns a
+    multiplicative correction of it from departures, so predictions adapt
+    during long runs without a full retrain:
+
+        LOS(x) = base(x) * exp(w . x + b)
+
+    Stays are censored by the simulation itself: a patient still in bed at
+    their predicted LOS is discharged then (Patient.tick), so such a stay
+    only tells that the real LOS is at least that long. Learning it as a
+    complete stay (or learning only the stays that ended earlier) pulls every
+    prediction down, and shorter predictions cut the next stays shorter still.
+    The correction is therefore fitted as a survival model: each departure
+    adds its days in bed as exposure, and only deaths and discharges before
+    the predicted LOS count as an end of stay. The departure rate is
+    1 / LOS(x), fitted by SGD on the censored (Poisson) likelihood.
+
+    Cost per event is bounded: observe() copies one row into a preallocated
+    buffer, and every batch_size events one gradient step runs on that buffer.
+    """
+
+    def __init__(self, base_model, n_features=7, batch_size=64, min_samples=256,
+                 snapshot_every=50, snapshot_path=None, learning_rate=0.05):
+        """
+        :param base_model: fitted LOS regressor, expects scaled features
+        :param batch_size: departures per gradient step
+        :param min_samples: no correction is applied before this many departures were learned
+        :param snapshot_every: save a snapshot every this many mini-batches (needs snapshot_path)
+        :param snapshot_path: where snapshots are written with joblib, None disables them
+        :param learning_rate: SGD step size on the log correction
+        """
+        self.base_model = base_model
+        self.batch_size = batch_size
+        self.min_samples = min_samples
+        self.snapshot_every = snapshot_every
+        self.snapshot_path = snapshot_path
+        self.learning_rate = learning_rate
+
+        # Log correction: w . x + b
+        self.coef = np.zeros(n_features)
+        self.intercept = 0.0
+
+        # Mini-batch buffer
+        self.X_buffer = np.empty((batch_size, n_features), dtype=np.float64)
+        self.y_buffer = np.empty(batch_size, dtype=np.float64)
+        self.censored_buffer = np.zeros(batch_size, dtype=bool)
+        self.buffered = 0
+
+        self.samples_seen = 0
+        self.batches_seen = 0
+
+    @property
+    def ready(self):
+        return self.samples_seen >= self.min_samples
+
+    def base_los(self, X_scaled):
+        return np.maximum(self.base_model.predict(X_scaled), MIN_LOS)
+
+    def correction(self, X_scaled):
+        """
+        Factor the base prediction of each row is multiplied by (ones while warming up)
+        """
+        if not self.ready:
+            return np.ones(len(X_scaled))
+        return np.exp(X_scaled @ self.coef + self.intercept)
+
+    def predict(self, X_scaled):
+        return np.maximum(self.base_los(X_scaled) * self.correction(X_scaled), MIN_LOS)
+
+    def observe(self, x_scaled, days_stayed, censored=False):
+        """
+        Records one departure (scaled feature row, days stayed)
+        :param censored: the stay was cut at the predicted LOS, the real one is at least days_stayed
+        """
+        self.X_buffer[self.buffered] = x_scaled
+        self.y_buffer[self.buffered] = days_stayed
+        self.censored_buffer[self.buffered] = censored
+        self.buffered += 1
+
+        if self.buffered == self.batch_size:
+            self.update()
+
+    def update(self):
+        """
+        Learns from the buffered departures and empties the buffer
+        """
+        if self.buffered == 0:
+            return
+
+        X = self.X_buffer[:self.buffered]
+        exposure = self.y_buffer[:self.buffered]
+        ended = ~self.censored_buffer[:self.buffered]
+
+        # Expected departures (exposure * rate) vs observed ones: more expected
+        # than observed means stays are longer than predicted
+        los = self.base_los(X) * np.exp(X @ self.coef + self.intercept)
+        gradient = exposure / los - ended
+
+        self.coef += self.learning_rate * gradient @ X / self.buffered
+        self.intercept += self.learning_rate * gradient.mean()
+        self.samples_seen += self.buffered
+        self.batches_seen += 1
+        self.buffered = 0
+
+        if self.snapshot_path is not None and self.batches_seen % self.snapshot_every == 0:
+            self.snapshot()
+
+    def snapshot(self, path=None):
+        """
+        Saves the learned correction (not the base model) with joblib
+        """
+        path = path or self.snapshot_path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        tmp_path = f"{path}.tmp"
+        joblib.dump({
+            "coef": self.coef,
+            "intercept": self.intercept,
+            "samples_seen": self.samples_seen,
+            "batches_seen": self.batches_seen,
+        }, tmp_path)
+        os.replace(tmp_path, path)
+
+    def restore(self, path=None):
+        """
+        Loads a snapshot written by snapshot()
+        """
+        state = joblib.load(path or self.snapshot_path)
+        self.coef = state["coef"]
+        self.intercept = state["intercept"]
+        self.samples_seen = state["samples_seen"]
+        self.batches_seen = state["batches_seen"]
@@ -0,0 +1,247 @@
+# src/agent/runtime.py
+#
+# Minimal inference runtime: the Triage / LOS models, the scaler and the
+# complaint encoding exported as plain numpy arrays (src/models/runtime.npz).
+# Loading and predicting only needs numpy, no scikit-learn, joblib or pandas,
+# which keeps start-up of short CLI runs and process-pool workers fast.
+#
+# Export (needs scikit-learn, run again whenever the .pkl files change):
+#     python -m src.agent.runtime
+
+import os
+
+import numpy as np
+
+RUNTIME_FILE = 'runtime.npz'
+
+
+# --- Export (scikit-learn side) ---
+
+def export_tree_ensemble(prefix, estimators, classifier):
+    """
+    Concatenates the trees of a DecisionTree / RandomForest / ExtraTrees model
+    into flat node arrays. Child indexes are made absolute, leaves point to -1.
+    """
+    features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+    offset = 0
+
+    for estimator in estimators:
+        tree = estimator.tree_
+        left = tree.children_left.astype(np.int64)
+        right = tree.children_right.astype(np.int64)
+        leaf = left == -1
+
+        if classifier:
+            value = tree.value[:, 0, :]
+            value = value / value.sum(axis=1, keepdims=True) # class probabilities per node
+        else:
+            value = tree.value[:, 0, 0]
+
+        roots.append(offset)
+        features.append(np.where(leaf, 0, tree.feature).astype(np.int64))
+        thresholds.append(tree.threshold)
+        lefts.append(np.where(leaf, -1, left + offset))
+        rights.append(np.where(leaf, -1, right + offset))
+        values.append(value)
+        offset += tree.node_count
+
+    return {
+        f'{prefix}_roots': np.array(roots, dtype=np.int64),
+        f'{prefix}_feature': np.concatenate(features),
+        f'{prefix}_threshold': np.concatenate(thresholds),
+        f'{prefix}_left': np.concatenate(lefts),
+        f'{prefix}_right': np.concatenate(rights),
+        f'{prefix}_value': np.concatenate(values),
+    }
+
+
+def export_model(prefix, model):
+    """
+    Flattens a fitted scikit-learn model into {name: array}, with its kind
+    """
+    name = type(model).__name__
+    arrays = {}
+
+    if name == 'GaussianNB':
+        kind = 'gaussian_nb'
+        arrays[f'{prefix}_theta'] = model.theta_
+        arrays[f'{prefix}_var'] = model.var_
+        arrays[f'{prefix}_log_prior'] = np.log(model.class_prior_)
+
+    elif hasattr(model, 'estimators_') or hasattr(model, 'tree_'):
+        classifier = hasattr(model, 'classes_')
+        kind = 'tree_classifier' if classifier else 'tree_regressor'
+        estimators = model.estimators_ if hasattr(model, 'estimators_') else [model]
+        arrays.update(export_tree_ensemble(prefix, estimators, classifier))
+
+    elif hasattr(model, 'coef_'):
+        classifier = hasattr(model, 'classes_')
+        kind = 'linear_classifier' if classifier else 'linear_regressor'
+        arrays[f'{prefix}_coef'] = np.atleast_2d(model.coef_) if classifier else np.ravel(model.coef_)
+        arrays[f'{prefix}_intercept'] = np.atleast_1d(model.intercept_).astype(np.float64)
+
+    else:
+        raise TypeError(f"{name} can not be exported to the runtime")
+
+    if hasattr(model, 'classes_'):
+        arrays[f'{prefix}_classes'] = np.asarray(model.classes_)
+
+    arrays[f'{prefix}_kind'] = np.array(kind)
+    return arrays
+
+
+def export_runtime(model_dir='src/models/', path=None):
+    """
+    Writes runtime.npz from the .pkl files in model_dir
+    """
+    import joblib
+
+    from src.simulation.hospital_env import COMPLAINTS
+
+    encoder_complaint = joblib.load(os.path.join(model_dir, 'encoder_complaint.pkl'))
+    if tuple(encoder_complaint.classes_) != COMPLAINTS:
+        raise ValueError(f"encoder_complaint.pkl classes {list(encoder_complaint.classes_)} "
+                         f"do not match COMPLAINTS {list(COMPLAINTS)}")
+
+    scaler = joblib.load(os.path.join(model_dir, 'scaler.pkl'))
+    arrays = {
+        'scaler_mean': scaler.mean_,
+        'scaler_scale': scaler.scale_,
+    }
+    arrays.update(export_model('triage', joblib.load(os.path.join(model_dir, 'triage.pkl'))))
+    arrays.update(export_model('los', joblib.load(os.path.join(model_dir, 'los.pkl'))))
+
+    path = path or os.path.join(model_dir, RUNTIME_FILE)
+    np.savez(path, **arrays)
+    return path
+
+
+# --- Runtime (numpy only) ---
+
+class Scaler:
+    """
+    StandardScaler parameters (same attributes the agent uses)
+    """
+
+    def __init__(self, mean, scale):
+        self.mean_ = mean
+        self.scale_ = scale
+
+    def transform(self, X):
+        return (np.asarray(X, dtype=np.float64) - self.mean_) / self.scale_
+
+
+class GaussianNBModel:
+    def __init__(self, theta, var, log_prior, classes):
+        self.theta = theta
+        self.var = var
+        self.classes_ = classes
+        self.log_norm = log_prior - 0.5 * np.log(2 * np.pi * var).sum(axis=1)
+
+    def predict(self, X):
+        X = np.asarray(X, dtype=np.float64)
+        log_likelihood = self.log_norm - 0.5 * (((X[:, None, :] - self.theta) ** 2) / self.var).sum(axis=2)
+        return self.classes_[log_likelihood.argmax(axis=1)]
+
+
+class LinearModel:
+    def __init__(self, coef, intercept, classes=None):
+        self.coef = coef
+        self.intercept = intercept
+        self.classes_ = classes
+
+    def predict(self, X):
+        X = np.asarray(X, dtype=np.float64)
+        if self.classes_ is None:
+            return X @ self.coef + self.intercept[0]
+
+        scores = X @ self.coef.T + self.intercept
+        if scores.shape[1] == 1: # binary
+            return self.classes_[(scores[:, 0] > 0).astype(np.int64)]
+        return self.classes_[scores.argmax(axis=1)]
+
+
+class TreeEnsembleModel:
+    """
+    Trees of an ensemble as flat node arrays, traversed for all rows and
+    all trees at once
+    """
+
+    def __init__(self, roots, feature, threshold, left, right, value, classes=None):
+        self.roots = roots
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.value = value
+        self.classes_ = classes
+
+    def leaves(self, X):
+        # scikit-learn trees compare float32 features
+        X = np.asarray(X, dtype=np.float32)
+        rows = np.arange(len(X))[:, None]
+        nodes = np.broadcast_to(self.roots, (len(X), len(self.roots))).copy()
+
+        while True:
+            internal = self.left[nodes] != -1
+            if not internal.any():
+                return nodes
+            go_left = X[rows, self.feature[nodes]] <= self.threshold[nodes]
+            nodes = np.where(internal, np.where(go_left, self.left[nodes], self.right[nodes]), nodes)
+
+    def predict(self, X):
+        values = self.value[self.leaves(X)].mean(axis=1)
+        if self.classes_ is None:
+            return values
+        return self.classes_[values.argmax(axis=1)]
+
+
+def build_model(prefix, arrays):
+    kind = str(arrays[f'{prefix}_kind'])
+    classes = arrays.get(f'{prefix}_classes')
+
+    if kind == 'gaussian_nb':
+        return GaussianNBModel(arrays[f'{prefix}_theta'], arrays[f'{prefix}_var'],
+                               arrays[f'{prefix}_log_prior'], classes)
+    if kind.startswith('linear'):
+        return LinearModel(arrays[f'{prefix}_coef'], arrays[f'{prefix}_intercept'], classes)
+    if kind.startswith('tree'):
+        return TreeEnsembleModel(*(arrays[f'{prefix}_{name}'] for name in
+                                   ('roots', 'feature', 'threshold', 'left', 'right', 'value')), classes)
+    raise ValueError(f"Unknown runtime model kind: {kind}")
+
+
+class RuntimeModels:
+    """
+    Triage model, LOS model and scaler loaded from runtime.npz
+    """
+
+    def __init__(self, path):
+        with np.load(path) as data:
+            arrays = {name: data[name] for name in data.files}
+
+        self.scaler = Scaler(arrays['scaler_mean'], arrays['scaler_scale'])
+        self.triage_model = build_model('triage', arrays)
+        self.los_model = build_model('los', arrays)
+
+
+def runtime_is_current(model_dir):
+    """
+    True if runtime.npz exists and is newer than every .pkl it was exported from
+    """
+    path = os.path.join(model_dir, RUNTIME_FILE)
+    if not os.path.exists(path):
+        return False
+
+    exported = os.path.getmtime(path)
+    for name in ('triage.pkl', 'los.pkl', 'scaler.pkl', 'encoder_complaint.pkl'):
+        source = os.path.join(model_dir, name)
+        if os.path.exists(source) and os.path.getmtime(source) > exported:
+            return False
+    return True
+
+
+if __name__ == "__main__":
+    import sys
+
+    print(f"Exported {export_runtime(*sys.argv[1:2])}")
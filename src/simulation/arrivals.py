@@ -0,0 +1,283 @@
+# src/simulation/arrivals.py
+#
+# Arrival processes: how many patients arrive each day, with which
+# complaint and at what hour. A process pre-samples a whole horizon for
+# many replications in one call, as arrays, so scenario generation is
+# never the bottleneck:
+#
+#     process = PoissonArrivals(base_rate=15, seasonal_amplitude=0.3,
+#                               surges=[SurgeEvent(start_day=40, duration=3, extra_rate=60,
+#                                                  complaint_weights={'Trauma': 1})])
+#     batch = process.sample(horizon=365, replications=100, rng=np.random.default_rng(0))
+#     X = batch.day(replication=0, day=40)   # (n, 7) feature rows of that day
+#
+# sample() draws all replications from one generator; sample_each() draws
+# each replication from its own generator, so a replication's arrivals do not
+# depend on which other replications were sampled with it.
+
+import numpy as np
+
+from src.simulation.hospital_env import COMPLAINTS, COMPLAINT_CODES
+from src.simulation.generator import ARRIVAL_COMPLAINTS, sample_patient_features
+
+DAYS_PER_YEAR = 365.25
+
+
+def complaint_vector(weights):
+    """
+    {'Flu': 3, 'Trauma': 1} -> weight vector in COMPLAINTS order
+    """
+    vector = np.zeros(len(COMPLAINTS))
+    for name, weight in weights.items():
+        vector[COMPLAINT_CODES[name]] = weight
+    return vector
+
+
+# Mix of generate_random_patient_features: four complaints, equally likely
+DEFAULT_COMPLAINT_WEIGHTS = complaint_vector({name: 1 for name in ARRIVAL_COMPLAINTS})
+
+# Extra mix at the peak of the season (flu and breathing problems)
+DEFAULT_SEASONAL_WEIGHTS = complaint_vector({'Flu': 1.5, 'Difficulty Breathing': 0.5})
+
+
+class ArrivalBatch:
+    """
+    Arrivals of a whole horizon for several replications.
+
+    counts: (replications, horizon) arrivals per day (column 0 is day 1)
+    features: (n, 7) feature rows in FEATURE_ORDER, ordered by replication,
+              day, then arrival hour
+    hours: (n,) arrival hour of each row (0-23)
+    replications: replication number of each row of counts (default 0, 1, 2...)
+    """
+
+    def __init__(self, counts, features, hours, replications=None):
+        self.counts = counts
+        self.features = features
+        self.hours = hours
+        self.offsets = np.concatenate([[0], np.cumsum(counts.ravel())])
+
+        if replications is None:
+            replications = range(len(counts))
+        self.replications = tuple(int(r) for r in replications)
+        self.index = {replication: i for i, replication in enumerate(self.replications)}
+
+    @classmethod
+    def stack(cls, batches, replications=None):
+        """
+        One batch holding the replications of several batches, in order
+        """
+        return cls(np.concatenate([batch.counts for batch in batches]),
+                   np.concatenate([batch.features for batch in batches]),
+                   np.concatenate([batch.hours for batch in batches]),
+                   replications)
+
+    @property
+    def horizon(self):
+        return self.counts.shape[1]
+
+    def rows(self, replication, day):
+        """
+        Slice of the rows arriving on a day (1-based, like Hospital.day)
+        """
+        i = self.index[replication] * self.horizon + day - 1
+        return slice(self.offsets[i], self.offsets[i + 1])
+
+    def day(self, replication, day):
+        return self.features[self.rows(replication, day)]
+
+
+class ArrivalProcess:
+    """
+    Base class. Subclasses define the expected arrivals per day and the
+    complaint mix per day; sampling is shared.
+    """
+
+    # Relative arrival rate per hour of the day (None = uniform)
+    hour_weights = None
+
+    def rates(self, days):
+        """
+        Expected arrivals on each of the given days (1-based)
+        """
+        raise NotImplementedError
+
+    def complaint_weights(self, days):
+        """
+        (len(days), n complaints) complaint weights on each day
+        """
+        return np.broadcast_to(DEFAULT_COMPLAINT_WEIGHTS, (len(days), len(COMPLAINTS)))
+
+    def sample_counts(self, horizon, replications, rng):
+        days = np.arange(1, horizon + 1)
+        return rng.poisson(self.rates(days), size=(replications, horizon))
+
+    def sample(self, horizon, replications=1, rng=None):
+        """
+        Samples arrival counts, complaints, hours and features for the whole
+        horizon of every replication, all as arrays.
+        """
+        if rng is None:
+            rng = np.random.default_rng()
+
+        days = np.arange(1, horizon + 1)
+        counts = np.asarray(self.sample_counts(horizon, replications, rng), dtype=np.int64)
+
+        # Day index (0-based) of every arrival, replications one after the other
+        day_index = np.repeat(np.tile(np.arange(horizon), replications), counts.ravel())
+        n = len(day_index)
+
+        # Complaints: inverse CDF of each day's mix
+        weights = np.asarray(self.complaint_weights(days), dtype=np.float64)
+        cdf = np.cumsum(weights, axis=1)
+        cdf /= cdf[:, -1:]
+        complaints = (rng.random(n)[:, None] >= cdf[day_index]).sum(axis=1)
+        complaints = np.minimum(complaints, len(COMPLAINTS) - 1)
+
+        if self.hour_weights is None:
+            hours = rng.integers(0, 24, n)
+        else:
+            hour_p = np.asarray(self.hour_weights, dtype=np.float64)
+            hours = rng.choice(24, size=n, p=hour_p / hour_p.sum())
+
+        features = sample_patient_features(complaints, rng)
+
+        # Within a day, patients arrive in hour order
+        group = np.repeat(np.arange(counts.size), counts.ravel())
+        order = np.lexsort((hours, group))
+
+        return ArrivalBatch(counts, features[order], hours[order].astype(np.int8))
+
+    def sample_each(self, horizon, rngs, replications=None):
+        """
+        Samples one replication per generator (each still vectorized over the
+        whole horizon) and stacks them into one ArrivalBatch.
+        """
+        return ArrivalBatch.stack([self.sample(horizon, 1, rng) for rng in rngs], replications)
+
+
+class UniformArrivals(ArrivalProcess):
+    """
+    The original process: 1 to max_per_day arrivals, uniformly, with the
+    fixed four-complaint mix
+    """
+
+    def __init__(self, max_per_day):
+        self.max_per_day = max_per_day
+
+    def rates(self, days):
+        return np.full(len(days), (1 + self.max_per_day) / 2)
+
+    def sample_counts(self, horizon, replications, rng):
+        return rng.integers(1, self.max_per_day + 1, size=(replications, horizon))
+
+
+class SurgeEvent:
+    """
+    Scheduled surge: extra_rate more arrivals per day for duration days
+    from start_day, e.g. a mass-casualty event with a trauma-only mix
+    """
+
+    def __init__(self, start_day, duration, extra_rate, complaint_weights=None):
+        """
+        :param complaint_weights: {complaint: weight} of the surge arrivals (None = normal mix)
+        """
+        self.start_day = start_day
+        self.duration = duration
+        self.extra_rate = extra_rate
+        self.complaint_weights = None if complaint_weights is None else complaint_vector(complaint_weights)
+
+    def rates(self, days):
+        active = (days >= self.start_day) & (days < self.start_day + self.duration)
+        return np.where(active, float(self.extra_rate), 0.0)
+
+
+class PoissonArrivals(ArrivalProcess):
+    """
+    Non-homogeneous Poisson arrivals:
+
+    rate(day) = base_rate * (1 + seasonal_amplitude * season(day)) * weekday_factors[day % 7]
+                + extra rate of the active surges
+
+    season(day) is a yearly cosine, 1 on peak_day and -1 half a year later.
+    The complaint mix shifts towards seasonal_weights as the season peaks,
+    and towards each surge's own mix while it is active.
+    """
+
+    def __init__(self, base_rate, seasonal_amplitude=0.0, peak_day=15, start_day_of_year=0,
+                 weekday_factors=None, complaint_weights=None, seasonal_weights=None,
+                 surges=(), hour_weights=None):
+        """
+        :param base_rate: mean arrivals per day
+        :param seasonal_amplitude: 0 = no season, 0.3 = +/-30% between peak and trough
+        :param peak_day: day of the year with the highest rate (default mid January)
+        :param start_day_of_year: day of the year of simulation day 1
+        :param weekday_factors: 7 rate multipliers, simulation day 1 is weekday 0
+        :param complaint_weights: {complaint: weight} base mix (default: generator's mix)
+        :param seasonal_weights: {complaint: weight} added at the season peak
+        :param surges: list of SurgeEvent
+        :param hour_weights: 24 relative arrival rates per hour of the day
+        """
+        self.base_rate = base_rate
+        self.seasonal_amplitude = seasonal_amplitude
+        self.peak_day = peak_day
+        self.start_day_of_year = start_day_of_year
+        self.weekday_factors = np.ones(7) if weekday_factors is None else np.asarray(weekday_factors, dtype=np.float64)
+        self.base_weights = DEFAULT_COMPLAINT_WEIGHTS if complaint_weights is None else complaint_vector(complaint_weights)
+        self.seasonal_weights = DEFAULT_SEASONAL_WEIGHTS if seasonal_weights is None else complaint_vector(seasonal_weights)
+        self.surges = list(surges)
+        self.hour_weights = hour_weights
+
+    def season(self, days):
+        day_of_year = self.start_day_of_year + days - 1
+        return np.cos(2 * np.pi * (day_of_year - self.peak_day) / DAYS_PER_YEAR)
+
+    def baseline_rates(self, days):
+        seasonal = 1 + self.seasonal_amplitude * self.season(days)
+        return np.maximum(self.base_rate * seasonal * self.weekday_factors[(days - 1) % 7], 0.0)
+
+    def rates(self, days):
+        rates = self.baseline_rates(days)
+        for surge in self.surges:
+            rates = rates + surge.rates(days)
+        return rates
+
+    def complaint_weights(self, days):
+        # Normalised base mix, shifted towards the seasonal mix near the peak
+        base = self.base_weights / self.base_weights.sum()
+        season = np.clip(self.seasonal_amplitude * self.season(days), 0, None)[:, None]
+        mix = base + season * self.seasonal_weights / max(self.seasonal_weights.sum(), 1e-12)
+        mix /= mix.sum(axis=1, keepdims=True)
+
+        # Blend in each surge's mix by its share of the day's arrivals
+        baseline = self.baseline_rates(days)[:, None]
+        weights = mix * baseline
+        for surge in self.surges:
+            surge_mix = mix if surge.complaint_weights is None else \
+                (surge.complaint_weights / surge.complaint_weights.sum())[None, :]
+            weights = weights + surge_mix * surge.rates(days)[:, None]
+
+        # Days with no expected arrivals keep the plain mix
+        return np.where(weights.sum(axis=1, keepdims=True) > 0, weights, mix)
+
+
+def make_arrival_process(spec, max_per_day=None):
+    """
+    Builds an ArrivalProcess from a JSON-like scenario spec, e.g.
+    {"process": "poisson", "base_rate": 15, "seasonal_amplitude": 0.3,
+     "surges": [{"start_day": 40, "duration": 3, "extra_rate": 60, "complaint_weights": {"Trauma": 1}}]}
+    None means the original uniform process with max_per_day.
+    """
+    if spec is None:
+        return UniformArrivals(max_per_day)
+
+    spec = dict(spec)
+    process = spec.pop("process", "poisson")
+
+    if process == "uniform":
+        return UniformArrivals(spec.get("max_per_day", max_per_day))
+    if process == "poisson":
+        surges = [SurgeEvent(**surge) for surge in spec.pop("surges", [])]
+        return PoissonArrivals(surges=surges, **spec)
+
+    raise ValueError(f"Unknown arrival process: {process}")
@@ -0,0 +1,157 @@
+# src/simulation/cache.py
+#
+# Content-addressed on-disk cache of simulation results.
+# An entry is keyed on everything that can change the output of a run:
+# the scenario config, the seed / replication, the model bundle and the
+# simulator code. Entries are .npz files of the per-day metric arrays,
+# evicted least-recently-used first once the cache grows past max_bytes.
+
+import glob
+import hashlib
+import json
+import os
+import zipfile
+
+import numpy as np
+
+SIMULATION_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Source files whose content defines the simulator code version
+CODE_DIRS = (
+    SIMULATION_DIR,
+    os.path.join(os.path.dirname(SIMULATION_DIR), 'agent'),
+)
+
+
+def hash_files(paths):
+    """
+    sha256 over the names and contents of the given files
+    """
+    digest = hashlib.sha256()
+    for path in sorted(paths):
+        digest.update(os.path.basename(path).encode())
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+    return digest.hexdigest()
+
+
+def code_version():
+    return hash_files([path for d in CODE_DIRS for path in glob.glob(os.path.join(d, '*.py'))])
+
+
+def model_version(model_dir):
+    return hash_files(glob.glob(os.path.join(model_dir, '*.pkl')) +
+                      glob.glob(os.path.join(model_dir, '*.npz')))
+
+
+class ResultCache:
+    """
+    Size bounded LRU cache of simulation results on disk
+    """
+
+    def __init__(self, cache_dir='data/cache', max_bytes=256 * 1024 * 1024, model_dir='src/models/'):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+
+        # Computed once: hashing the models on every lookup would cost more than the lookup
+        self.model_version = model_version(model_dir)
+        self.code_version = code_version()
+
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def key(self, scenario, seed, replication=0):
+        """
+        Hex digest identifying one (scenario, seed, replication) run
+        """
+        payload = json.dumps({
+            "scenario": scenario,
+            "seed": seed,
+            "replication": replication,
+            "models": self.model_version,
+            "code": self.code_version,
+        }, sort_keys=True)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.cache_dir, key + '.npz')
+
+    def get(self, key):
+        """
+        Returns the cached {metric: array} dict, or None on a miss
+        """
+        path = self.path(key)
+        try:
+            with np.load(path) as data:
+                results = {name: data[name] for name in data.files}
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, EOFError, zipfile.BadZipFile):
+            # Truncated or corrupt entry: drop it and count a miss
+            self.remove(path)
+            return None
+
+        os.utime(path) # mark as recently used
+        return results
+
+    def put(self, key, results):
+        """
+        Stores a result dict, then evicts old entries if the cache is too big
+        """
+        path = self.path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+
+        with open(tmp_path, 'wb') as f:
+            np.savez_compressed(f, **results)
+        os.replace(tmp_path, path) # atomic, concurrent readers never see half a file
+
+        self.evict()
+
+    def get_or_run(self, scenario, seed, run, replication=0):
+        """
+        Returns the cached results of a run, or calls
+        run(scenario, seed, replication) and caches what it returns
+        """
+        key = self.key(scenario, seed, replication)
+        results = self.get(key)
+        if results is None:
+            results = run(scenario, seed, replication)
+            self.put(key, results)
+        return results
+
+    def entries(self):
+        """
+        List of (mtime, size, path), least recently used first
+        """
+        entries = []
+        for path in glob.glob(os.path.join(self.cache_dir, '*.npz')):
+            try:
+                st = os.stat(path)
+            except FileNotFoundError: # evicted by another process
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+        entries.sort()
+        return entries
+
+    def size(self):
+        return sum(size for _, size, _ in self.entries())
+
+    def evict(self):
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            self.remove(path)
+            total -= size
+
+    def remove(self, path):
+        try:
+            os.remove(path)
+        except FileNotFoundError: # removed by another process
+            pass
+
+    def clear(self):
+        for _, _, path in self.entries():
+            self.remove(path)
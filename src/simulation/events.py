@@ -0,0 +1,128 @@
+import json
+import os
+
+import numpy as np
+
+EVENT_FIELDS = ('day', 'patient_id', 'event', 'ward')
+
+
+class EventLog:
+    """
+    Typed event records (day, patient id, event code, ward) buffered in
+    preallocated arrays and flushed to a sink in batches.
+    Without a sink, a full buffer is simply emptied (nothing is written).
+    """
+
+    def __init__(self, sink=None, capacity=65536):
+        self.sink = sink
+        self.capacity = capacity
+
+        self.day = np.empty(capacity, dtype=np.int32)
+        self.patient_id = np.empty(capacity, dtype=np.int64)
+        self.event = np.empty(capacity, dtype=np.int8)
+        self.ward = np.empty(capacity, dtype=np.int8)
+
+        self.size = 0  # events currently buffered
+        self.total = 0 # events logged since creation
+
+    def append(self, day, patient_id, code, ward):
+        if self.size == self.capacity:
+            self.flush()
+
+        i = self.size
+        self.day[i] = day
+        self.patient_id[i] = patient_id
+        self.event[i] = code
+        self.ward[i] = ward
+        self.size += 1
+        self.total += 1
+
+    def batch(self):
+        """
+        Buffered events as a dict of array views {field: array}
+        """
+        return {
+            'day': self.day[:self.size],
+            'patient_id': self.patient_id[:self.size],
+            'event': self.event[:self.size],
+            'ward': self.ward[:self.size],
+        }
+
+    def flush(self):
+        """
+        Writes the buffered events to the sink and empties the buffer
+        """
+        if self.sink is not None and self.size:
+            self.sink.write(self.batch())
+        self.size = 0
+
+    def close(self):
+        self.flush()
+        if self.sink is not None:
+            self.sink.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class NDJSONSink:
+    """
+    One JSON object per line, appended batch by batch.
+    event / ward are the integer values of EventCode / BedType.
+    """
+
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.file = open(path, 'w', encoding='utf-8')
+
+        # Keys are the same on every line, only the numbers change
+        self.fmt = json.dumps({field: 0 for field in EVENT_FIELDS}).replace('0', '%d')
+
+    def write(self, batch):
+        rows = np.column_stack([batch[field].astype(np.int64) for field in EVENT_FIELDS])
+        np.savetxt(self.file, rows, fmt=self.fmt)
+
+    def close(self):
+        self.file.close()
+
+
+class ParquetSink:
+    """
+    Streaming Parquet file, one row group per flushed batch (needs pyarrow).
+    """
+
+    def __init__(self, path):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("ParquetSink needs pyarrow: pip install pyarrow (or use NDJSONSink)") from e
+
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.pa = pa
+        self.schema = pa.schema([
+            ('day', pa.int32()),
+            ('patient_id', pa.int64()),
+            ('event', pa.int8()),
+            ('ward', pa.int8()),
+        ])
+        self.writer = pq.ParquetWriter(path, self.schema)
+
+    def write(self, batch):
+        table = self.pa.Table.from_arrays([batch[field] for field in EVENT_FIELDS], schema=self.schema)
+        self.writer.write_table(table)
+
+    def close(self):
+        self.writer.close()
+
+
+def open_sink(path):
+    """
+    NDJSONSink or ParquetSink, picked from the file extension
+    """
+    if path.endswith('.parquet'):
+        return ParquetSink(path)
+    return NDJSONSink(path)
@@ -1,9 +1,10 @@
-import pandas as pd
 import numpy as np
 import os
 import random
 
 def generate_patient_data(num_patients = 10000, save_path = 'data/raw/patients.csv'):
+    import pandas as pd # only needed to write the dataset
+
     print(f"Generating {num_patients} synthetic patients....")
 
     data = []
@@ -97,45 +98,97 @@ def generate_patient_data(num_patients = 10000, save_path = 'data/raw/patients.c
     df.to_csv(save_path, index=False)
     print(f"Success! Data saved to: {save_path}")
 
-def generate_random_patient_features():
+_default_rng = np.random.default_rng()
+
+ARRIVAL_COMPLAINTS = ['Chest Pain', 'Flu', 'Difficulty Breathing', 'Trauma']
+
+def generate_random_patient_features(rng=None):
     """
     Creates a dictionary of random vitals to simulate a new arrival.
     We use similar logic to the generator to ensure realistic patterns.
+
+    :param rng: numpy Generator to draw from (e.g. RandomStreams.vitals(patient_id)),
+                None uses an unseeded module level generator
     """
-    complaint = random.choice(['Chest Pain', 'Flu', 'Difficulty Breathing', 'Trauma'])
+    if rng is None:
+        rng = _default_rng
+
+    def randint(low, high): # inclusive on both ends, like random.randint
+        return int(rng.integers(low, high + 1))
+
+    complaint = ARRIVAL_COMPLAINTS[rng.integers(len(ARRIVAL_COMPLAINTS))]
     
     # Basic correlations
-    hr = random.randint(60, 90)       # Normal
-    bp = random.randint(110, 130)     # Normal
-    temp = random.uniform(36.5, 37.2) # Normal
-    spo2 = random.randint(97, 100)    # Normal
+    hr = randint(60, 90)       # Normal
+    bp = randint(110, 130)     # Normal
+    temp = rng.uniform(36.5, 37.2) # Normal
+    spo2 = randint(97, 100)    # Normal
 
     if complaint == 'Chest Pain':
-        hr = random.randint(100, 140)   # Tachycardia
-        bp = random.randint(150, 200)   # Hypertension
+        hr = randint(100, 140)   # Tachycardia
+        bp = randint(150, 200)   # Hypertension
             
     elif complaint == 'Flu':
-        temp = random.uniform(37.5, 40.5) # Fever
-        hr = random.randint(90, 110)
+        temp = rng.uniform(37.5, 40.5) # Fever
+        hr = randint(90, 110)
             
     elif complaint == 'Difficulty Breathing':
-        spo2 = random.randint(80, 95)     # Hypoxia
-        hr = random.randint(100, 120)
+        spo2 = randint(80, 95)     # Hypoxia
+        hr = randint(100, 120)
 
     elif complaint == 'Trauma':
-        hr = random.randint(110, 140)     # Shock
-        bp = random.randint(80, 110) 
+        hr = randint(110, 140)     # Shock
+        bp = randint(80, 110) 
         
     return {
-        "Age": random.randint(18, 90),
-        "Gender": random.choice([0, 1]),
+        "Age": randint(18, 90),
+        "Gender": randint(0, 1),
         "HR": hr,
         "BP": bp,
-        "Temp": round(temp, 1),
+        "Temp": round(float(temp), 1),
         "SpO2": spo2,
         "Complaint": complaint
     }
 
+# (HR, BP, Temp, SpO2) ranges per complaint for the vectorized sampler, inclusive
+# (same patterns as generate_random_patient_features, General Checkup keeps normal vitals)
+VITALS_RANGES = {
+    'Chest Pain':           ((100, 140), (150, 200), (36.5, 37.2), (97, 100)),
+    'Difficulty Breathing': ((100, 120), (110, 130), (36.5, 37.2), (80, 95)),
+    'Flu':                  ((90, 110),  (110, 130), (37.5, 40.5), (97, 100)),
+    'General Checkup':      ((60, 90),   (110, 130), (36.5, 37.2), (97, 100)),
+    'Trauma':               ((110, 140), (80, 110),  (36.5, 37.2), (97, 100)),
+}
+
+def sample_patient_features(complaint_codes, rng=None):
+    """
+    Vectorized generate_random_patient_features: one feature row per complaint code.
+    Returns a (n, 7) matrix in FEATURE_ORDER (FEATURE_DTYPE).
+    """
+    from src.simulation.hospital_env import COMPLAINTS, FEATURE_DTYPE
+
+    if rng is None:
+        rng = _default_rng
+
+    codes = np.asarray(complaint_codes, dtype=np.int64)
+    n = len(codes)
+
+    # [complaint, vital, low / high]
+    ranges = np.array([VITALS_RANGES[name] for name in COMPLAINTS], dtype=np.float64)
+    low = ranges[codes, :, 0]
+    high = ranges[codes, :, 1]
+    u = rng.random((n, 4))
+
+    X = np.empty((n, 7), dtype=FEATURE_DTYPE)
+    X[:, 0] = rng.integers(18, 91, n)        # Age
+    X[:, 1] = rng.integers(0, 2, n)          # Gender
+    X[:, 2] = codes                          # Complaint_Code
+    X[:, 3] = np.floor(low[:, 0] + u[:, 0] * (high[:, 0] - low[:, 0] + 1)) # HR
+    X[:, 4] = np.floor(low[:, 1] + u[:, 1] * (high[:, 1] - low[:, 1] + 1)) # BP
+    X[:, 5] = np.round(low[:, 2] + u[:, 2] * (high[:, 2] - low[:, 2]), 1)  # Temp
+    X[:, 6] = np.floor(low[:, 3] + u[:, 3] * (high[:, 3] - low[:, 3] + 1)) # SpO2
+    return X
+
 if __name__ == "__main__":
     # This block allows you to run this script directly
     generate_patient_data()
\ No newline at end of file
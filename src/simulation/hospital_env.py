@@ -1,37 +1,170 @@
 import numpy as np
 import random
+from enum import IntEnum
+
+from src.simulation.resources import (Resource, ResourcePool, N_RESOURCES, N_NEEDS, UNLIMITED,
+                                      NEED_VENTILATOR, NEED_ISOLATION)
+
+# Column order of the feature row (same order the models were trained on)
+FEATURE_ORDER = ('Age', 'Gender', 'Complaint_Code', 'HR', 'BP', 'Temp', 'SpO2')
+
+# Complaint codes, in the order the LabelEncoder assigned them
+COMPLAINTS = ('Chest Pain', 'Difficulty Breathing', 'Flu', 'General Checkup', 'Trauma')
+COMPLAINT_CODES = {name: code for code, name in enumerate(COMPLAINTS)}
+
+FEATURE_DTYPE = np.float32
+
+# Urgency labels by code, in the order the LabelEncoder assigned them
+URGENCY_LABELS = ('Critical', 'Low', 'Medium')
+
+
+class State(IntEnum):
+    """
+    health state of a patient, the values double as indexes into the
+    transition probability rows below
+    """
+    STABLE = 0
+    CRITICAL = 1
+    DISCHARGED = 2
+    DECEASED = 3
+
+
+class BedType(IntEnum):
+    ICU = 0
+    GENERAL = 1
+    STEP_DOWN = 2
+
+
+# Bed resource used by each bed type
+BED_RESOURCE = {
+    BedType.ICU: Resource.ICU_BED,
+    BedType.GENERAL: Resource.GENERAL_BED,
+    BedType.STEP_DOWN: Resource.STEP_DOWN_BED,
+}
+
+# Default nurse staffing: patients per nurse on each bed type
+NURSE_RATIOS = {
+    BedType.ICU: 2,
+    BedType.GENERAL: 6,
+    BedType.STEP_DOWN: 3,
+}
+
+
+class EventCode(IntEnum):
+    DISCHARGED = 0
+    DECEASED = 1
+    DETERIORATED = 2 # turned Critical outside the ICU
+
+
+def render_event(patient_id, code, ward):
+    """
+    Text version of one event, for verbose output
+    """
+    ward = BedType(ward)
+    if code == EventCode.DISCHARGED:
+        return f"Patient {patient_id} recovered and left {ward.name}."
+    elif code == EventCode.DECEASED:
+        return f"Patient {patient_id} passed away in {ward.name}."
+    ward_name = "General Ward" if ward == BedType.GENERAL else "Step-Down Unit"
+    return f"WARNING: Patient {patient_id} in {ward_name} turned Critical!"
+
+
+# Transition rows: [To Stable, To Critical, To Discharged, To Deceased]
+PROBS_STABLE = np.array([0.80, 0.05, 0.15, 0.00])
+PROBS_STABLE_MEDIUM = np.array([0.80, 0.10, 0.05, 0.05])
+PROBS_CRITICAL_ICU = np.array([0.30, 0.60, 0.05, 0.05])
+PROBS_CRITICAL_GENERAL = np.array([0.10, 0.50, 0.05, 0.35])
+PROBS_CRITICAL_STEP_DOWN = np.array([0.20, 0.55, 0.05, 0.20])
+PROBS_CRITICAL_NO_BED = np.array([0.00, 0.40, 0.00, 0.60])
+
+
+def _cdf(probs):
+    cdf = np.cumsum(probs)
+    cdf[-1] = 1.0
+    return cdf
+
+
+# Cumulative rows, a single uniform draw is mapped to the next state with them
+CDF_STABLE = _cdf(PROBS_STABLE)
+CDF_STABLE_MEDIUM = _cdf(PROBS_STABLE_MEDIUM)
+CDF_CRITICAL_ICU = _cdf(PROBS_CRITICAL_ICU)
+CDF_CRITICAL_GENERAL = _cdf(PROBS_CRITICAL_GENERAL)
+CDF_CRITICAL_STEP_DOWN = _cdf(PROBS_CRITICAL_STEP_DOWN)
+CDF_CRITICAL_NO_BED = _cdf(PROBS_CRITICAL_NO_BED)
+
+
+def encode_features(features, dtype=FEATURE_DTYPE):
+    """
+    Converts a feature dictionary (e.g. {'Age': 20, 'Complaint': 'Flu'...})
+    into a fixed-dtype row in FEATURE_ORDER. Unknown complaints get code 0.
+    Arrays are passed through, so a row of a larger feature matrix stays a view.
+    """
+    if isinstance(features, np.ndarray):
+        return np.asarray(features, dtype=dtype)
+
+    return np.array([
+        features['Age'],
+        features['Gender'],
+        COMPLAINT_CODES.get(features['Complaint'], 0),
+        features['HR'],
+        features['BP'],
+        features['Temp'],
+        features['SpO2'],
+    ], dtype=dtype)
+
+
+def infer_needs(row, urgency):
+    """
+    Extra resources a patient needs on top of a bed (NEED_* bitmask):
+    a ventilator for hypoxic critical patients, an isolation room for febrile flu.
+    """
+    needs = 0
+    if urgency == 0 and row[6] < 90: # Critical with SpO2 < 90
+        needs |= NEED_VENTILATOR
+    if row[2] == COMPLAINT_CODES['Flu'] and row[5] > 38.5:
+        needs |= NEED_ISOLATION
+    return needs
+
 
 class Patient:
     """
     defines about the patient and if they get better or worse
     """
-    def __init__(self, patient_id, features, predicted_los, predicted_urgency):  # __init__ is used as a cunstructor
+    __slots__ = ('id', 'features', 'expected_los', 'urgency_label',
+                 'days_stayed', 'assigned_bed_type', 'current_state', 'rng', 'needs')
+
+    def __init__(self, patient_id, features, predicted_los, predicted_urgency, rng=None):  # __init__ is used as a cunstructor
 
         """
         Docstring for __init__
         
         initialize a patient
         :param patient_id: unique id
-        :param features: dict of data containing Age, HR, BP, etc
+        :param features: dict of data containing Age, HR, BP, etc, or a feature row in FEATURE_ORDER
         :param predicted_los: predicted length of stay
         :param predicted_urgency: predicted urgency level
+        :param rng: numpy Generator for the health transitions (None = global numpy random)
         """
 
         self.id = patient_id
-        self.features = features
+        self.features = encode_features(features)
 
-        self.expected_los = predicted_los
-        self.urgency_label = predicted_urgency
+        self.expected_los = float(predicted_los)
+        self.urgency_label = int(predicted_urgency)
+        self.needs = infer_needs(self.features, self.urgency_label)
 
         self.days_stayed = 0
         self.assigned_bed_type = None #initially has no bed
+        self.rng = rng
 
         if predicted_urgency == 0: # Critical
-            self.current_state = "Critical"
-        elif predicted_urgency == 2: # Discharge
-            self.current_state = "stable"
+            self.current_state = State.CRITICAL
         else:
-            self.current_state = "Stable"
+            self.current_state = State.STABLE
+
+    @property
+    def complaint(self):
+        return COMPLAINTS[int(self.features[2])]
 
     def update_vitals(self):
         """
@@ -45,43 +178,31 @@ class Patient:
         """
         HMM Logic with RESOURCE DEPENDENCY
         """
+        state = self.current_state
+
         # Handle Terminal States
-        if self.current_state in ["Discharged", "Deceased"]:
-            return self.current_state
-
-        # Define Probabilities
-        # Format: [To Stable, To Critical, To Discharged, To Deceased]
-        probs = None 
-
-        if self.current_state == "Stable":
-            probs = [0.80, 0.05, 0.15, 0.00] 
-            
-            if self.urgency_label == 2: 
-                probs = [0.80, 0.10, 0.05, 0.05]
-
-        elif self.current_state == "Critical":
-            
-            if self.assigned_bed_type == "ICU":
-                # [Stable, Critical, Discharged, Deceased]
-                probs = [0.30, 0.60, 0.05, 0.05] 
-            
-            elif self.assigned_bed_type == "GENERAL":
-                probs = [0.10, 0.50, 0.05, 0.35] 
-                
+        if state >= State.DISCHARGED:
+            return state
+
+        if state == State.CRITICAL:
+            if self.assigned_bed_type == BedType.ICU:
+                cdf = CDF_CRITICAL_ICU
+            elif self.assigned_bed_type == BedType.GENERAL:
+                cdf = CDF_CRITICAL_GENERAL
+            elif self.assigned_bed_type == BedType.STEP_DOWN:
+                cdf = CDF_CRITICAL_STEP_DOWN
             else:
-                probs = [0.00, 0.40, 0.00, 0.60] 
+                cdf = CDF_CRITICAL_NO_BED
 
-        if probs is None:
-            self.current_state = "Stable"
-            probs = [0.80, 0.05, 0.15, 0.00]
+        elif self.urgency_label == 2:
+            cdf = CDF_STABLE_MEDIUM
+
+        else:
+            cdf = CDF_STABLE
+
+        rng = self.rng if self.rng is not None else np.random
+        new_state = State(int(cdf.searchsorted(rng.random(), side='right')))
 
-        states = ["Stable", "Critical", "Discharged", "Deceased"]
-        
-        probs = np.array(probs)
-        probs /= probs.sum()
-        
-        new_state = np.random.choice(states, p=probs)
-        
         self.current_state = new_state
         return new_state
 
@@ -92,8 +213,8 @@ class Patient:
         self.days_stayed += 1
         
         # Force discharge if they exceeded their LOS (Simulation Logic)
-        if self.days_stayed >= self.expected_los and self.current_state != "Deceased":
-            self.current_state = "Discharged"
+        if self.days_stayed >= self.expected_los and self.current_state != State.DECEASED:
+            self.current_state = State.DISCHARGED
         else:
             self.next_state()
 
@@ -103,16 +224,47 @@ class Hospital:
     defines the Hospital and how many beds are empty
     """
 
-    def __init__(self, total_icu, total_general):
+    def __init__(self, total_icu, total_general, streams=None, metrics=None, event_log=None,
+                 total_step_down=0, resources=None, nurse_ratios=None):
+        """
+        :param total_step_down: step-down beds
+        :param resources: capacity of the other resources, e.g. {Resource.VENTILATOR: 10,
+                          Resource.ISOLATION_ROOM: 4, Resource.NURSE: 20}. Resources left
+                          out are not constrained.
+        :param nurse_ratios: patients per nurse per bed type (default NURSE_RATIOS)
+        :param streams: RandomStreams, admitted patients without their own
+                        rng get their transition stream from it
+        :param metrics: SimulationMetrics, updated with every departure
+        :param event_log: EventLog receiving a record per discharge / death / deterioration
+        """
+        self.streams = streams
+        self.metrics = metrics
+        self.event_log = event_log
+        self.day = 0 # days simulated so far
+
+        # Called with each discharged or deceased patient, e.g. HospitalAgent.observe_departure
+        self.on_departure = None
+
         # Resource Tracking
         self.capacity = {
-            "ICU": total_icu,
-            "GENERAL": total_general
-        }
-        self.occupied = {
-            "ICU": [],      # List of Patient Objects
-            "GENERAL": []   # List of Patient Objects
+            BedType.ICU: total_icu,
+            BedType.GENERAL: total_general,
+            BedType.STEP_DOWN: total_step_down
         }
+        self.occupied = {bed_type: [] for bed_type in BedType} # Lists of Patient Objects
+
+        capacity = np.full(N_RESOURCES, UNLIMITED)
+        for bed_type, resource in BED_RESOURCE.items():
+            capacity[resource] = self.capacity[bed_type]
+        for resource, amount in (resources or {}).items():
+            resource = Resource(resource)
+            if resource in BED_RESOURCE.values():
+                raise ValueError(f"{resource.name} is set by total_icu / total_general / total_step_down, "
+                                 f"not by resources")
+            capacity[resource] = amount
+        self.resources = ResourcePool(capacity)
+
+        self.demand = self.build_demand(nurse_ratios or NURSE_RATIOS)
         
         # Statistics for Reporting
         self.stats = {
@@ -122,7 +274,28 @@ class Hospital:
             "refused": 0
         }
         
-    def admit_patient(self, patient, bed_type):
+    @staticmethod
+    def build_demand(nurse_ratios):
+        """
+        Demand table [bed type, needs mask] -> resource vector, so a patient's
+        demand is a lookup instead of being built on every admission
+        """
+        demand = np.zeros((len(BedType), N_NEEDS, N_RESOURCES))
+        for bed_type in BedType:
+            demand[bed_type, :, BED_RESOURCE[bed_type]] = 1
+            demand[bed_type, :, Resource.NURSE] = 1 / nurse_ratios[bed_type]
+        for needs in range(N_NEEDS):
+            demand[:, needs, Resource.VENTILATOR] = bool(needs & NEED_VENTILATOR)
+            demand[:, needs, Resource.ISOLATION_ROOM] = bool(needs & NEED_ISOLATION)
+        return demand
+
+    def free(self, resource):
+        """
+        Free amount of a resource (inf if it is not constrained)
+        """
+        return self.resources.capacity[resource] - self.resources.usage[resource]
+
+    def admit_patient(self, patient, bed_type, count_refusal=True):
         """
         Docstring for admit_patient
         
@@ -131,56 +304,120 @@ class Hospital:
         """
         Attempts to put a patient in a bed.
         Returns True if successful, False if full.
+        count_refusal=False leaves the refusal count alone (for overflow attempts,
+        the caller calls refuse_patient once all options failed).
         """
-        if len(self.occupied[bed_type]) < self.capacity[bed_type]:
+        if isinstance(bed_type, str):
+            bed_type = BedType[bed_type]
+
+        if self.resources.reserve(self.demand[bed_type, patient.needs]):
             self.occupied[bed_type].append(patient)
             patient.assigned_bed_type = bed_type
+            if patient.rng is None and self.streams is not None:
+                patient.rng = self.streams.transitions(patient.id)
             self.stats["admitted"] += 1
             return True
         else:
-            self.stats["refused"] += 1
+            if count_refusal:
+                self.stats["refused"] += 1
             return False
 
+    def refuse_patient(self, patient):
+        self.stats["refused"] += 1
+
+    def admit_batch(self, patients, bed_types):
+        """
+        Admits leading patients to their bed type (one per patient) for as
+        long as their resources fit together. Feasibility and reservation are
+        one vector operation over the whole run, and the outcome is the same
+        as calling admit_patient on each until the first one that does not fit.
+        Returns the number of admitted patients; the others are left untouched
+        (no refusal is counted).
+        """
+        needs = np.fromiter((patient.needs for patient in patients), dtype=np.int64, count=len(patients))
+        admitted = self.resources.reserve_batch(self.demand[bed_types, needs])
+
+        for patient, bed_type in zip(patients[:admitted], bed_types[:admitted]):
+            bed_type = BedType(bed_type)
+            self.occupied[bed_type].append(patient)
+            patient.assigned_bed_type = bed_type
+            if patient.rng is None and self.streams is not None:
+                patient.rng = self.streams.transitions(patient.id)
+
+        self.stats["admitted"] += admitted
+        return admitted
+
     def simulate_day(self, verbose=True):
         """
         The Main Loop: Updates every patient currently in a bed.
-        Returns a list of event strings for the UI.
+        Discharges, deaths and deteriorations are appended to the event log
+        (if there is one) as typed records. They are only rendered as text
+        when verbose, in which case the list of event strings is returned
+        (an empty list otherwise).
         """
+        self.day += 1
         events = []
         if verbose:
             print(f"\n--- End of Day Report ---")
         
-        for bed_type in ["ICU", "GENERAL"]:
-            for patient in self.occupied[bed_type][:]: 
+        for bed_type in BedType:
+            staying = []
+            departed_needs = []
+
+            for patient in self.occupied[bed_type]:
                 
                 patient.tick() # Advance time/health
+                state = patient.current_state
                 
                 # Handle Departures
-                if patient.current_state == "Discharged":
-                    msg = f"Patient {patient.id} recovered and left {bed_type}."
-                    events.append(msg)
-                    if verbose: print(msg)
-                    self.occupied[bed_type].remove(patient)
+                if state == State.DISCHARGED:
+                    code = EventCode.DISCHARGED
+                    departed_needs.append(patient.needs)
+                    patient.rng = None
                     self.stats["discharged"] += 1
+                    if self.metrics is not None:
+                        self.metrics.record_departure(patient)
+                    if self.on_departure is not None:
+                        self.on_departure(patient)
                     
-                elif patient.current_state == "Deceased":
-                    msg = f"Patient {patient.id} passed away in {bed_type}."
-                    events.append(msg)
-                    if verbose: print(msg)
-                    self.occupied[bed_type].remove(patient)
+                elif state == State.DECEASED:
+                    code = EventCode.DECEASED
+                    departed_needs.append(patient.needs)
+                    patient.rng = None
                     self.stats["deceased"] += 1
+                    if self.metrics is not None:
+                        self.metrics.record_departure(patient)
+                    if self.on_departure is not None:
+                        self.on_departure(patient)
                     
-                elif patient.current_state == "Critical" and bed_type == "GENERAL":
-                    msg = f"WARNING: Patient {patient.id} in General Ward turned Critical!"
+                else:
+                    staying.append(patient)
+                    if state == State.CRITICAL and bed_type != BedType.ICU:
+                        code = EventCode.DETERIORATED
+                    else:
+                        continue
+
+                if self.event_log is not None:
+                    self.event_log.append(self.day, patient.id, code, bed_type)
+                if verbose:
+                    msg = render_event(patient.id, code, bed_type)
                     events.append(msg)
-                    if verbose: print(msg)
+                    print(msg)
+
+            self.occupied[bed_type] = staying
+
+            # Release the resources of everyone who left, grouped by needs mask
+            if departed_needs:
+                counts = np.bincount(departed_needs, minlength=N_NEEDS)
+                self.resources.release(counts @ self.demand[bed_type])
         
         return events
 
     def get_status(self):
         return {
-            "ICU_Free": self.capacity["ICU"] - len(self.occupied["ICU"]),
-            "Gen_Free": self.capacity["GENERAL"] - len(self.occupied["GENERAL"]),
+            "ICU_Free": self.capacity[BedType.ICU] - len(self.occupied[BedType.ICU]),
+            "Gen_Free": self.capacity[BedType.GENERAL] - len(self.occupied[BedType.GENERAL]),
+            "StepDown_Free": self.capacity[BedType.STEP_DOWN] - len(self.occupied[BedType.STEP_DOWN]),
             "Total_Refused": self.stats["refused"]
         }
 
@@ -0,0 +1,243 @@
+import math
+
+import numpy as np
+
+from src.simulation.hospital_env import BedType, State, COMPLAINTS, URGENCY_LABELS
+
+# Columns of the per-urgency outcome counters
+OUTCOMES = ("Admitted", "Refused", "Discharged", "Deceased")
+ADMITTED, REFUSED, DISCHARGED, DECEASED = range(len(OUTCOMES))
+
+
+class RunningStats:
+    """
+    Count, mean, variance, min and max of a stream (Welford's algorithm).
+    Two RunningStats can be merged, e.g. across replications.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0 # sum of squared differences from the mean
+        self.min = math.inf
+        self.max = -math.inf
+
+    def update(self, x):
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (x - self.mean)
+        if x < self.min:
+            self.min = x
+        if x > self.max:
+            self.max = x
+
+    def merge(self, other):
+        """
+        Adds the values seen by another RunningStats (Chan et al. parallel update)
+        """
+        if other.count == 0:
+            return self
+        if self.count == 0:
+            self.count, self.mean, self.m2 = other.count, other.mean, other.m2
+            self.min, self.max = other.min, other.max
+            return self
+
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.count = count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    @property
+    def variance(self):
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def std(self):
+        return math.sqrt(self.variance)
+
+
+class QuantileSketch:
+    """
+    Mergeable quantile sketch with a fixed number of log-spaced buckets
+    (the DDSketch idea): every quantile is returned within relative_accuracy
+    of the true value, for values in [min_value, max_value]. Values below
+    min_value (including 0) are counted as 0, values above max_value are
+    clamped. Memory does not grow with the number of values.
+    """
+
+    def __init__(self, relative_accuracy=0.01, min_value=1e-2, max_value=1e5):
+        self.relative_accuracy = relative_accuracy
+        self.min_value = min_value
+        self.max_value = max_value
+
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.offset = math.ceil(math.log(min_value) / self.log_gamma)
+        n_buckets = math.ceil(math.log(max_value) / self.log_gamma) - self.offset + 1
+
+        self.counts = np.zeros(n_buckets, dtype=np.int64)
+        self.zero_count = 0
+        self.count = 0
+
+    def bucket(self, x):
+        return min(math.ceil(math.log(x) / self.log_gamma) - self.offset, len(self.counts) - 1)
+
+    def update(self, x):
+        self.count += 1
+        if x < self.min_value:
+            self.zero_count += 1
+        else:
+            self.counts[self.bucket(x)] += 1
+
+    def merge(self, other):
+        if (other.relative_accuracy, other.min_value, other.max_value) != \
+           (self.relative_accuracy, self.min_value, self.max_value):
+            raise ValueError("Only sketches with the same parameters can be merged")
+
+        self.counts += other.counts
+        self.zero_count += other.zero_count
+        self.count += other.count
+        return self
+
+    def quantile(self, q):
+        """
+        Approximate q-quantile (0 <= q <= 1), NaN if the sketch is empty
+        """
+        if self.count == 0:
+            return math.nan
+
+        rank = q * (self.count - 1)
+        if rank < self.zero_count:
+            return 0.0
+
+        index = int(np.searchsorted(np.cumsum(self.counts), rank - self.zero_count, side='right'))
+        index = min(index, len(self.counts) - 1)
+        return 2 * self.gamma ** (index + self.offset) / (self.gamma + 1)
+
+
+class Metric:
+    """
+    RunningStats and QuantileSketch of the same stream
+    """
+
+    def __init__(self):
+        self.stats = RunningStats()
+        self.sketch = QuantileSketch()
+
+    def update(self, x):
+        self.stats.update(x)
+        self.sketch.update(x)
+
+    def merge(self, other):
+        self.stats.merge(other.stats)
+        self.sketch.merge(other.sketch)
+        return self
+
+    def quantile(self, q):
+        """
+        Sketch estimate, kept within the exact min / max
+        """
+        if self.stats.count == 0:
+            return math.nan
+        return min(max(self.sketch.quantile(q), self.stats.min), self.stats.max)
+
+    def summary(self):
+        return {
+            "count": self.stats.count,
+            "mean": self.stats.mean,
+            "std": self.stats.std,
+            "p50": self.quantile(0.5),
+            "p90": self.quantile(0.9),
+            "p99": self.quantile(0.99),
+            "max": self.stats.max,
+        }
+
+
+class SimulationMetrics:
+    """
+    Constant memory summary of a run, updated in place as events happen.
+
+    - los: days stayed of every patient that left (discharged or deceased)
+    - wait: days between arrival and admission. The allocator admits or
+      refuses on arrival, so every admission currently records 0 days.
+    - occupancy: occupied beds per bed type, once per simulated day
+    - outcomes: counters per urgency level x OUTCOMES
+    - complaints: arrivals per complaint
+
+    Metrics of parallel replications can be combined with merge().
+    """
+
+    def __init__(self):
+        self.los = Metric()
+        self.wait = Metric()
+        self.occupancy = {bed_type: Metric() for bed_type in BedType}
+
+        self.outcomes = np.zeros((len(URGENCY_LABELS), len(OUTCOMES)), dtype=np.int64)
+        self.complaints = np.zeros(len(COMPLAINTS), dtype=np.int64)
+        self.days = 0
+
+    def record_arrival(self, patient, wait_days=0):
+        """
+        Call once the allocator decided on a new patient
+        """
+        self.complaints[int(patient.features[2])] += 1
+
+        if patient.assigned_bed_type is None:
+            self.outcomes[patient.urgency_label, REFUSED] += 1
+        else:
+            self.outcomes[patient.urgency_label, ADMITTED] += 1
+            self.wait.update(wait_days)
+
+    def record_departure(self, patient):
+        """
+        Call when a patient leaves a bed (discharged or deceased)
+        """
+        outcome = DECEASED if patient.current_state == State.DECEASED else DISCHARGED
+        self.outcomes[patient.urgency_label, outcome] += 1
+        self.los.update(patient.days_stayed)
+
+    def record_occupancy(self, hospital):
+        """
+        Call once per simulated day
+        """
+        self.days += 1
+        for bed_type, metric in self.occupancy.items():
+            metric.update(len(hospital.occupied[bed_type]))
+
+    def merge(self, other):
+        self.los.merge(other.los)
+        self.wait.merge(other.wait)
+        for bed_type, metric in self.occupancy.items():
+            metric.merge(other.occupancy[bed_type])
+
+        self.outcomes += other.outcomes
+        self.complaints += other.complaints
+        self.days += other.days
+        return self
+
+    def outcome_table(self):
+        """
+        {urgency label: {outcome: count}}
+        """
+        return {
+            label: dict(zip(OUTCOMES, self.outcomes[code].tolist()))
+            for code, label in enumerate(URGENCY_LABELS)
+        }
+
+    def complaint_counts(self):
+        return dict(zip(COMPLAINTS, self.complaints.tolist()))
+
+    def summary(self):
+        return {
+            "days": self.days,
+            "arrivals": int(self.complaints.sum()),
+            "los": self.los.summary(),
+            "wait": self.wait.summary(),
+            "occupancy": {bed_type.name: metric.summary() for bed_type, metric in self.occupancy.items()},
+            "outcomes": self.outcome_table(),
+        }
@@ -0,0 +1,76 @@
+from enum import IntEnum
+
+import numpy as np
+
+
+class Resource(IntEnum):
+    """
+    Resource types, the values index the capacity / usage / demand vectors
+    """
+    ICU_BED = 0
+    GENERAL_BED = 1
+    STEP_DOWN_BED = 2
+    ISOLATION_ROOM = 3
+    VENTILATOR = 4
+    NURSE = 5 # fractional: a patient uses 1 / (patients per nurse) of a nurse
+
+
+N_RESOURCES = len(Resource)
+
+# Capacity of resources a hospital does not constrain
+UNLIMITED = np.inf
+
+# Extra needs of a patient on top of a bed, as a bitmask
+NEED_VENTILATOR = 1
+NEED_ISOLATION = 2
+N_NEEDS = 4 # number of possible masks
+
+# Tolerance for fractional (nurse) usage adding up
+EPSILON = 1e-9
+
+
+class ResourcePool:
+    """
+    Capacity and usage of every resource type as NumPy vectors.
+    A demand is a vector of the same length; feasibility, reservation and
+    release are a few vector operations whatever the number of resource types.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = np.asarray(capacity, dtype=np.float64)
+        self.usage = np.zeros_like(self.capacity)
+
+    def free(self):
+        return self.capacity - self.usage
+
+    def fits(self, demand):
+        return bool(np.all(self.usage + demand <= self.capacity + EPSILON))
+
+    def reserve(self, demand):
+        """
+        Reserves the demand if it fits. Returns True if reserved.
+        """
+        if not self.fits(demand):
+            return False
+        self.usage += demand
+        return True
+
+    def reserve_batch(self, demands):
+        """
+        Reserves the longest run of leading demand rows that fit together,
+        in one step. Rows are reserved in order, exactly as calling reserve()
+        on each until the first one that does not fit.
+        Returns the number of reserved rows.
+        """
+        if len(demands) == 0 or not self.fits(demands[0]):
+            return 0
+
+        cumulative = self.usage + np.cumsum(demands, axis=0)
+        fits = np.all(cumulative <= self.capacity + EPSILON, axis=1)
+        prefix = len(demands) if fits.all() else int(np.argmin(fits))
+
+        self.usage = cumulative[prefix - 1]
+        return prefix
+
+    def release(self, demand):
+        self.usage -= demand
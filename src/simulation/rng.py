@@ -0,0 +1,73 @@
+import numpy as np
+
+# Purposes: each one gets its own independent family of streams
+ARRIVALS = 0
+VITALS = 1
+TRANSITIONS = 2
+ARRIVAL_PROCESS = 3
+
+
+class RandomStreams:
+    """
+    Seeding scheme for the simulation.
+
+    Every random draw comes from a counter-based Philox stream keyed on
+    (master seed, replication, purpose, key...), e.g. the transitions of
+    patient 17 in replication 3. Streams never depend on how many numbers
+    other streams consumed, so a run, a replication or a single patient's
+    trajectory can be replayed exactly, and replications can be split
+    across processes without changing their results.
+    """
+
+    def __init__(self, seed=None, replication=0):
+        """
+        :param seed: master seed (int). None picks a fresh one from OS entropy,
+                     which is kept in self.seed so the run can be replayed
+        :param replication: index of the replication these streams belong to
+        """
+        if seed is None:
+            seed = np.random.SeedSequence().entropy
+
+        self.seed = int(seed)
+        self.replication = int(replication)
+
+    def generator(self, purpose, *key):
+        """
+        Returns a fresh numpy Generator for one (purpose, key) stream.
+        Asking twice for the same stream returns the same sequence.
+        """
+        seq = np.random.SeedSequence(self.seed, spawn_key=(self.replication, purpose) + key)
+        return np.random.Generator(np.random.Philox(seq))
+
+    def arrivals(self, day):
+        """
+        Stream for the number of arrivals of a given day
+        """
+        return self.generator(ARRIVALS, day)
+
+    def vitals(self, patient_id):
+        """
+        Stream for the features (complaint, vitals, age...) of one patient
+        """
+        return self.generator(VITALS, patient_id)
+
+    def transitions(self, patient_id):
+        """
+        Stream for the daily health transitions of one patient
+        """
+        return self.generator(TRANSITIONS, patient_id)
+
+    def arrival_process(self):
+        """
+        Stream for the pre-sampled arrivals of a whole horizon (src/simulation/arrivals.py)
+        """
+        return self.generator(ARRIVAL_PROCESS)
+
+    def for_replication(self, replication):
+        """
+        Streams of another replication under the same master seed
+        """
+        return RandomStreams(self.seed, replication)
+
+    def __repr__(self):
+        return f"RandomStreams(seed={self.seed}, replication={self.replication})"
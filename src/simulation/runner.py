@@ -0,0 +1,300 @@
+# src/simulation/runner.py
+#
+# Headless simulation runs: same loop as main.py, without printing,
+# returning per-day metric arrays instead.
+#
+# Sweep from the command line (results are served from the cache when
+# the same configuration was already simulated):
+#     python -m src.simulation.runner --icu 10 15 --general 30 40 --arrivals 20 --seeds 0 1 2
+#
+# Poisson arrivals with a flu season and a 3-day surge of 60 extra patients from day 20:
+#     python -m src.simulation.runner --base-rate 15 --seasonality 0.3 --surge 20:3:60
+#
+# Event log of every discharge / death / deterioration (one file per run):
+#     python -m src.simulation.runner --days 365 --events logs/events.parquet
+
+import argparse
+import contextlib
+import itertools
+import os
+
+import numpy as np
+
+from src.simulation.hospital_env import Hospital, Patient, BedType
+from src.simulation.generator import generate_random_patient_features
+from src.simulation.rng import RandomStreams
+from src.simulation.resources import Resource
+from src.simulation.arrivals import make_arrival_process
+from src.simulation.events import EventLog, open_sink
+
+DEFAULT_SCENARIO = {
+    "days": 50,
+    "total_icu": 15,
+    "total_general": 40,
+    "total_step_down": 0,
+    "ventilators": None,     # None = not constrained
+    "isolation_rooms": None,
+    "nurses": None,
+    "max_patients_per_day": 20,
+    "arrivals": None,        # None = 1 to max_patients_per_day per day, else a spec for make_arrival_process
+    "policy": "default",
+    "online_los": False,
+}
+
+# Per-day arrays returned by run_scenario
+METRICS = ("arrivals", "admitted", "refused", "discharged", "deceased",
+           "icu_occupied", "general_occupied", "step_down_occupied")
+
+# Scenario keys of the resources that are not beds
+SCENARIO_RESOURCES = {
+    "ventilators": Resource.VENTILATOR,
+    "isolation_rooms": Resource.ISOLATION_ROOM,
+    "nurses": Resource.NURSE,
+}
+
+
+def allocate_default(agent, patient, hospital):
+    return agent.allocate_resources(patient, hospital)
+
+
+def allocate_default_batch(agent, patients, hospital):
+    return agent.allocate_batch(patients, hospital)
+
+
+# Allocation policies selectable through scenario["policy"]
+POLICIES = {
+    "default": allocate_default,
+}
+
+# Same decisions as POLICIES, for a list of patients at once (pre-sampled arrivals)
+BATCH_POLICIES = {
+    "default": allocate_default_batch,
+}
+
+
+def make_scenario(**overrides):
+    """
+    Returns DEFAULT_SCENARIO updated with the given keys
+    """
+    unknown = set(overrides) - set(DEFAULT_SCENARIO)
+    if unknown:
+        raise KeyError(f"Unknown scenario keys: {sorted(unknown)}")
+
+    scenario = dict(DEFAULT_SCENARIO)
+    scenario.update(overrides)
+    return scenario
+
+
+def sample_arrivals(scenario, seed, replications=1):
+    """
+    Pre-samples the arrivals of every day of the scenario for several
+    replications in one call. Returns an ArrivalBatch.
+    :param replications: number of replications (0, 1, 2...) or the replication numbers
+    Each replication comes from its own stream, so its arrivals are the same
+    whether it is sampled alone or with others.
+    """
+    if isinstance(replications, int):
+        replications = range(replications)
+
+    process = make_arrival_process(scenario["arrivals"], scenario["max_patients_per_day"])
+    rngs = [RandomStreams(seed, replication).arrival_process() for replication in replications]
+    return process.sample_each(scenario["days"], rngs, replications)
+
+
+def run_scenario(scenario, agent, seed, replication=0, metrics=None, event_log=None, arrivals=None):
+    """
+    Simulates one scenario for one replication.
+    Returns a dict {metric name: np.ndarray of length scenario["days"]}
+    :param metrics: optional SimulationMetrics updated during the run
+                    (pass the same one to several replications, or merge them afterwards)
+    :param event_log: optional EventLog receiving every discharge / death / deterioration
+    :param arrivals: optional ArrivalBatch from sample_arrivals holding this replication,
+                     sampled here if the scenario has an arrival process
+    """
+    days = scenario["days"]
+    max_patients = scenario["max_patients_per_day"]
+    allocate = POLICIES[scenario["policy"]]
+
+    streams = RandomStreams(seed, replication)
+    resources = {resource: scenario[key] for key, resource in SCENARIO_RESOURCES.items()
+                 if scenario[key] is not None}
+    hospital = Hospital(total_icu=scenario["total_icu"],
+                        total_general=scenario["total_general"],
+                        total_step_down=scenario["total_step_down"],
+                        resources=resources,
+                        streams=streams,
+                        metrics=metrics,
+                        event_log=event_log)
+
+    if scenario["online_los"]:
+        # Fresh model per run (no snapshots), so runs stay independent of each other
+        agent.enable_online_los(snapshot_path=None)
+        hospital.on_departure = agent.observe_departure
+    else:
+        agent.online_los = None
+
+    if arrivals is None and scenario["arrivals"] is not None:
+        arrivals = sample_arrivals(scenario, seed, [replication])
+    allocate_batch = BATCH_POLICIES[scenario["policy"]]
+
+    results = {name: np.zeros(days, dtype=np.int32) for name in METRICS}
+    patient_counter = 0
+    previous = dict(hospital.stats)
+
+    for day in range(days):
+        hospital.simulate_day(verbose=False)
+
+        if arrivals is None:
+            new_patients = int(streams.arrivals(day + 1).integers(1, max_patients + 1))
+            for _ in range(new_patients):
+                patient_counter += 1
+                features = generate_random_patient_features(streams.vitals(patient_counter))
+                pred_urgency, pred_los = agent.predictor(features)
+                patient = Patient(patient_counter, features, pred_los, pred_urgency)
+                allocate(agent, patient, hospital)
+                if metrics is not None:
+                    metrics.record_arrival(patient)
+        else:
+            # The day's rows were sampled up front, predict and allocate them in one call
+            X = arrivals.day(replication, day + 1)
+            new_patients = len(X)
+            urgencies, los = agent.predict_batch(X) if new_patients else ((), ())
+            patients = [Patient(patient_counter + i + 1, X[i], los[i], urgencies[i]) for i in range(new_patients)]
+            patient_counter += new_patients
+            allocate_batch(agent, patients, hospital)
+            if metrics is not None:
+                for patient in patients:
+                    metrics.record_arrival(patient)
+
+        results["arrivals"][day] = new_patients
+        for name in ("admitted", "refused", "discharged", "deceased"):
+            results[name][day] = hospital.stats[name] - previous[name]
+        results["icu_occupied"][day] = len(hospital.occupied[BedType.ICU])
+        results["general_occupied"][day] = len(hospital.occupied[BedType.GENERAL])
+        results["step_down_occupied"][day] = len(hospital.occupied[BedType.STEP_DOWN])
+        previous = dict(hospital.stats)
+
+        if metrics is not None:
+            metrics.record_occupancy(hospital)
+
+    return results
+
+
+def event_path(path, run, runs):
+    """
+    Event log file of one run of a sweep: path itself for a single run,
+    else the run number before the extension (events.parquet -> events-3.parquet)
+    """
+    if runs == 1:
+        return path
+    root, ext = os.path.splitext(path)
+    return f"{root}-{run}{ext}"
+
+
+def run_sweep(scenarios, seeds, cache=None, model_dir='src/models/', events=None):
+    """
+    Runs every scenario for every seed, going through the result cache.
+    The agent (and its models) is only loaded if something is not cached.
+    Returns a list of (scenario, seed, results).
+    :param events: event log path (see event_path). Every run is then simulated,
+                   cached results have no events to write.
+    """
+    agent = None
+    sweep = []
+    runs = list(itertools.product(scenarios, seeds))
+
+    for run, (scenario, seed) in enumerate(runs):
+        results = None
+        if cache is not None and events is None:
+            results = cache.get(cache.key(scenario, seed))
+
+        if results is None:
+            if agent is None:
+                from src.agent.allocator import HospitalAgent
+                agent = HospitalAgent(model_dir=model_dir)
+
+            log = EventLog(open_sink(event_path(events, run, len(runs)))) if events else contextlib.nullcontext()
+            with log as event_log:
+                results = run_scenario(scenario, agent, seed, event_log=event_log)
+            if cache is not None:
+                cache.put(cache.key(scenario, seed), results)
+
+        sweep.append((scenario, seed, results))
+
+    return sweep
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sweep hospital scenarios (cached).")
+    parser.add_argument("--days", type=int, nargs="+", default=[DEFAULT_SCENARIO["days"]])
+    parser.add_argument("--icu", type=int, nargs="+", default=[DEFAULT_SCENARIO["total_icu"]])
+    parser.add_argument("--general", type=int, nargs="+", default=[DEFAULT_SCENARIO["total_general"]])
+    parser.add_argument("--step-down", type=int, nargs="+", default=[DEFAULT_SCENARIO["total_step_down"]])
+    parser.add_argument("--ventilators", type=int, nargs="+", default=[DEFAULT_SCENARIO["ventilators"]])
+    parser.add_argument("--isolation-rooms", type=int, nargs="+", default=[DEFAULT_SCENARIO["isolation_rooms"]],
+                        help="Isolation rooms (default: not constrained)")
+    parser.add_argument("--nurses", type=float, nargs="+", default=[DEFAULT_SCENARIO["nurses"]],
+                        help="Nurses on shift (default: not constrained)")
+    parser.add_argument("--arrivals", type=int, nargs="+",
+                        help=f"Max arrivals per day, uniform (default: {DEFAULT_SCENARIO['max_patients_per_day']})")
+    parser.add_argument("--base-rate", type=float, help="Poisson arrivals with this mean per day (instead of --arrivals)")
+    parser.add_argument("--seasonality", type=float, help="Seasonal amplitude of the Poisson rate, e.g. 0.3 (needs --base-rate)")
+    parser.add_argument("--surge", action="append", default=[], metavar="START:DAYS:EXTRA",
+                        help="Surge of EXTRA arrivals per day for DAYS days from day START (repeatable, needs --base-rate)")
+    parser.add_argument("--policy", nargs="+", default=[DEFAULT_SCENARIO["policy"]], choices=sorted(POLICIES))
+    parser.add_argument("--online-los", action="store_true", help="Update the LOS model from discharges during each run")
+    parser.add_argument("--seeds", type=int, nargs="+", default=[0])
+    parser.add_argument("--model-dir", default="src/models/")
+    parser.add_argument("--cache-dir", default="data/cache")
+    parser.add_argument("--no-cache", action="store_true")
+    parser.add_argument("--events", metavar="PATH",
+                        help="Write an event log per run (.parquet needs pyarrow, else NDJSON)")
+    args = parser.parse_args()
+
+    arrival_spec = None
+    if args.base_rate is None:
+        if args.seasonality is not None or args.surge:
+            parser.error("--seasonality and --surge need --base-rate (Poisson arrivals)")
+        max_per_day = args.arrivals or [DEFAULT_SCENARIO["max_patients_per_day"]]
+    else:
+        if args.arrivals is not None:
+            parser.error("--arrivals (uniform arrivals) can not be combined with --base-rate")
+        surges = []
+        for surge in args.surge:
+            try:
+                start, duration, extra = surge.split(":")
+                surges.append({"start_day": int(start), "duration": int(duration), "extra_rate": float(extra)})
+            except ValueError:
+                parser.error(f"--surge expects START:DAYS:EXTRA, got '{surge}'")
+        arrival_spec = {"process": "poisson", "base_rate": args.base_rate,
+                        "seasonal_amplitude": args.seasonality or 0.0, "surges": surges}
+        # Not used by Poisson arrivals: keep the default so runs share one cache key
+        max_per_day = [DEFAULT_SCENARIO["max_patients_per_day"]]
+
+    scenarios = [
+        make_scenario(days=days, total_icu=icu, total_general=general, total_step_down=step_down,
+                      ventilators=ventilators, isolation_rooms=isolation_rooms, nurses=nurses,
+                      max_patients_per_day=arrivals, arrivals=arrival_spec, policy=policy, online_los=args.online_los)
+        for days, icu, general, step_down, ventilators, isolation_rooms, nurses, arrivals, policy
+        in itertools.product(args.days, args.icu, args.general, args.step_down, args.ventilators,
+                             args.isolation_rooms, args.nurses, max_per_day, args.policy)
+    ]
+
+    cache = None
+    if not args.no_cache:
+        from src.simulation.cache import ResultCache
+        cache = ResultCache(cache_dir=args.cache_dir, model_dir=args.model_dir)
+
+    print(f"{'days':>5} {'icu':>4} {'gen':>4} {'sd':>4} {'vent':>5} {'iso':>4} {'nurse':>6} "
+          f"{'max/day':>7} {'policy':>8} {'seed':>5} {'admitted':>9} {'refused':>8} {'deceased':>9}")
+    for scenario, seed, results in run_sweep(scenarios, args.seeds, cache, args.model_dir, args.events):
+        limits = [("-" if scenario[key] is None else scenario[key]) for key in SCENARIO_RESOURCES]
+        max_day = "-" if scenario["arrivals"] is not None else scenario["max_patients_per_day"]
+        print(f"{scenario['days']:>5} {scenario['total_icu']:>4} {scenario['total_general']:>4} "
+              f"{scenario['total_step_down']:>4} {limits[0]:>5} {limits[1]:>4} {limits[2]:>6} "
+              f"{max_day:>7} {scenario['policy']:>8} {seed:>5} "
+              f"{results['admitted'].sum():>9} {results['refused'].sum():>8} {results['deceased'].sum():>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+# src/simulation/trace.py
+#
+# Trace-driven replay: instead of synthetic arrivals, stream recorded
+# arrivals (e.g. data/raw/patients.csv) through the agent and the wards.
+# The file is read in chunks, so traces of any size replay in constant memory.
+#
+#     python -m src.simulation.trace data/raw/patients.csv --arrivals-per-day 20
+#     python -m src.simulation.trace arrivals.csv --time-column AdmitDate
+
+import argparse
+import contextlib
+
+import numpy as np
+
+from src.simulation.hospital_env import (Hospital, Patient, FEATURE_ORDER, FEATURE_DTYPE,
+                                         COMPLAINT_CODES)
+
+# Columns read from the trace besides the time column
+TRACE_COLUMNS = ['ID', 'Age', 'Gender', 'HR', 'BP', 'Temp', 'SpO2', 'Complaint']
+
+
+def to_day_numbers(times, origin):
+    """
+    Converts a chunk of the time column to day numbers (1 = first day of the trace).
+    Numeric columns are taken as day numbers, anything else is parsed as dates.
+    Returns (days, origin), origin being the first timestamp (set on the first chunk).
+    """
+    import pandas as pd
+
+    if pd.api.types.is_numeric_dtype(times):
+        days = times.to_numpy(dtype=np.int64)
+        if origin is None:
+            origin = days[0] - 1
+        return days - origin, origin
+
+    stamps = pd.to_datetime(times).dt.normalize()
+    if origin is None:
+        origin = stamps.iloc[0]
+    return (stamps - origin).dt.days.to_numpy(dtype=np.int64) + 1, origin
+
+
+def iter_trace(path, time_column='Day', arrivals_per_day=None, chunksize=100_000):
+    """
+    Yields (day, ids, X) for every day of the trace that has arrivals:
+    ids is an int64 array, X a (n, 7) FEATURE_DTYPE matrix in FEATURE_ORDER.
+
+    Rows must be sorted by time_column. A trace without a time column
+    (like patients.csv) needs arrivals_per_day: consecutive rows are then
+    grouped into days of that size. Missing ID columns are numbered by row.
+    """
+    import pandas as pd
+
+    header = pd.read_csv(path, nrows=0).columns
+    use_time = time_column is not None and time_column in header
+    if not use_time and not arrivals_per_day:
+        raise ValueError(f"{path} has no '{time_column}' column, pass arrivals_per_day")
+
+    usecols = [c for c in TRACE_COLUMNS if c in header] + ([time_column] if use_time else [])
+    reader = pd.read_csv(path, usecols=usecols, chunksize=chunksize, memory_map=True)
+
+    origin = None
+    row = 0
+    pending = None # (day, ids, X) of the last day of the previous chunk, may continue
+
+    for chunk in reader:
+        n = len(chunk)
+
+        if use_time:
+            days, origin = to_day_numbers(chunk[time_column], origin)
+        else:
+            days = np.arange(row, row + n) // arrivals_per_day + 1
+
+        ids = chunk['ID'].to_numpy(dtype=np.int64) if 'ID' in chunk else np.arange(row, row + n)
+        row += n
+
+        X = np.empty((n, len(FEATURE_ORDER)), dtype=FEATURE_DTYPE)
+        for i, name in enumerate(FEATURE_ORDER):
+            if name == 'Complaint_Code':
+                X[:, i] = chunk['Complaint'].map(COMPLAINT_CODES).fillna(0).to_numpy()
+            else:
+                X[:, i] = chunk[name].to_numpy()
+
+        # Start of every run of equal days
+        starts = np.flatnonzero(np.r_[True, days[1:] != days[:-1]])
+        ends = np.r_[starts[1:], n]
+
+        for start, end in zip(starts, ends):
+            day = int(days[start])
+
+            if pending is not None:
+                if pending[0] == day: # same day continues from the previous chunk
+                    pending = (day, np.concatenate([pending[1], ids[start:end]]),
+                               np.concatenate([pending[2], X[start:end]]))
+                    continue
+                if day < pending[0]:
+                    raise ValueError(f"{path} is not sorted by '{time_column}' (day {day} after {pending[0]})")
+                yield pending
+
+            pending = (day, ids[start:end], X[start:end])
+
+    if pending is not None:
+        yield pending
+
+
+def replay_trace(path, agent, hospital, time_column='Day', arrivals_per_day=None,
+                 chunksize=100_000, metrics=None, verbose=False):
+    """
+    Feeds a recorded arrival stream through the agent and the hospital.
+    Every day of the trace (including days without arrivals) is simulated
+    and its occupancy recorded, then that day's arrivals are predicted and allocated in one batch
+    (HospitalAgent.allocate_batch).
+    Returns the number of replayed arrivals.
+    """
+    arrivals = 0
+
+    for day, ids, X in iter_trace(path, time_column, arrivals_per_day, chunksize):
+        while hospital.day < day:
+            hospital.simulate_day(verbose=verbose)
+            # Days without arrivals get their occupancy here, the arrival day after allocation
+            if metrics is not None and hospital.day < day:
+                metrics.record_occupancy(hospital)
+
+        urgency, los = agent.predict_batch(X)
+
+        patients = [Patient(int(ids[i]), X[i], los[i], urgency[i]) for i in range(len(ids))]
+        actions = agent.allocate_batch(patients, hospital)
+
+        for patient, action in zip(patients, actions):
+            if metrics is not None:
+                metrics.record_arrival(patient)
+            if verbose:
+                print(f"Patient {patient.id} ({patient.complaint}) -> Action: {action}")
+
+        if metrics is not None:
+            metrics.record_occupancy(hospital)
+        arrivals += len(ids)
+
+    return arrivals
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded arrivals through the hospital.")
+    parser.add_argument("path", help="CSV trace, sorted by the time column")
+    parser.add_argument("--time-column", default="Day", help="Day number or date column (default: Day)")
+    parser.add_argument("--arrivals-per-day", type=int, help="Group rows into days when there is no time column")
+    parser.add_argument("--chunksize", type=int, default=100_000)
+    parser.add_argument("--icu", type=int, default=15)
+    parser.add_argument("--general", type=int, default=40)
+    parser.add_argument("--seed", type=int, help="Seed of the health transitions")
+    parser.add_argument("--model-dir", default="src/models/")
+    parser.add_argument("--events", metavar="PATH",
+                        help="Write the event log to PATH (.parquet needs pyarrow, else NDJSON)")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    from src.agent.allocator import HospitalAgent
+    from src.simulation.metrics import SimulationMetrics
+    from src.simulation.rng import RandomStreams
+    from src.simulation.events import EventLog, open_sink
+
+    streams = RandomStreams(args.seed)
+    metrics = SimulationMetrics()
+    agent = HospitalAgent(model_dir=args.model_dir)
+
+    # The log is closed (last batch flushed, file finalised) even if the replay fails
+    log = EventLog(open_sink(args.events)) if args.events else contextlib.nullcontext()
+    with log as event_log:
+        hospital = Hospital(total_icu=args.icu, total_general=args.general, streams=streams,
+                            metrics=metrics, event_log=event_log)
+        arrivals = replay_trace(args.path, agent, hospital, args.time_column, args.arrivals_per_day,
+                                args.chunksize, metrics, args.verbose)
+
+    print(f"Replayed {arrivals} arrivals over {hospital.day} days (seed {streams.seed})")
+    print(f"Admitted: {hospital.stats['admitted']}, Discharged: {hospital.stats['discharged']}, "
+          f"Deceased: {hospital.stats['deceased']}")
+    for urgency, outcomes in metrics.outcome_table().items():
+        print(f"{urgency}: " + ", ".join(f"{outcome} {count}" for outcome, count in outcomes.items()))
+
+
+if __name__ == "__main__":
+    main()
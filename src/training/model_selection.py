@@ -0,0 +1,206 @@
+# src/training/model_selection.py
+#
+# Latency-aware model selection for the Triage and LOS models.
+# Every candidate is trained on data/raw/patients.csv and benchmarked on
+# accuracy (F1 / MAE) AND inference cost (single-row latency, per-row
+# batch latency, pickled size, load time). The report marks the Pareto
+# optimal candidates (accuracy vs single-row latency) and the most accurate
+# one within the latency budget is exported to src/models/.
+#
+# Run from the repository root:
+#     python -m src.training.model_selection --latency-budget-ms 2
+#     python -m src.training.model_selection --dry-run   # report only
+
+import argparse
+import io
+import os
+import pickle
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
+from sklearn.linear_model import LinearRegression, LogisticRegression, Ridge
+from sklearn.metrics import f1_score, mean_absolute_error, r2_score
+from sklearn.model_selection import train_test_split
+from sklearn.naive_bayes import GaussianNB
+from sklearn.tree import DecisionTreeClassifier, DecisionTreeRegressor
+
+FEATURE_ORDER = ['Age', 'Gender', 'Complaint_Code', 'HR', 'BP', 'Temp', 'SpO2']
+
+
+def triage_candidates():
+    return {
+        "GaussianNB": GaussianNB(),
+        "LogisticRegression": LogisticRegression(max_iter=1000),
+        "DecisionTree(depth=6)": DecisionTreeClassifier(max_depth=6, random_state=0),
+        "RandomForest(50, depth=8)": RandomForestClassifier(n_estimators=50, max_depth=8, random_state=0),
+    }
+
+
+def los_candidates():
+    return {
+        "LinearRegression": LinearRegression(),
+        "Ridge": Ridge(),
+        "DecisionTree(depth=8)": DecisionTreeRegressor(max_depth=8, random_state=0),
+        "RandomForest(10, depth=8)": RandomForestRegressor(n_estimators=10, max_depth=8, random_state=0),
+        "RandomForest(30, depth=10)": RandomForestRegressor(n_estimators=30, max_depth=10, random_state=0),
+        "RandomForest(100)": RandomForestRegressor(random_state=0), # the notebook's model
+    }
+
+
+def load_data(data_path, model_dir):
+    """
+    Encodes and scales the dataset with the encoders the agent uses at runtime
+    """
+    data = pd.read_csv(data_path)
+
+    encoder_complaint = joblib.load(os.path.join(model_dir, 'encoder_complaint.pkl'))
+    encoder_urgency = joblib.load(os.path.join(model_dir, 'encoder_urgency.pkl'))
+    scaler = joblib.load(os.path.join(model_dir, 'scaler.pkl'))
+
+    data['Complaint_Code'] = encoder_complaint.transform(data['Complaint'])
+    X = scaler.transform(data[FEATURE_ORDER])
+
+    return X, encoder_urgency.transform(data['Urgency']), data['LOS'].to_numpy()
+
+
+def median_time(fn, repeats):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return float(np.median(times))
+
+
+def benchmark(model, X_test, repeats=50, batch_size=1000):
+    """
+    Inference cost of a fitted model:
+    single-row latency (ms), batch latency per row (us), pickled size (KB), load time (ms)
+    """
+    row = X_test[:1]
+    batch = X_test[:batch_size]
+
+    payload = pickle.dumps(model, protocol=pickle.HIGHEST_PROTOCOL)
+
+    return {
+        "single_ms": median_time(lambda: model.predict(row), repeats) * 1e3,
+        "batch_us_per_row": median_time(lambda: model.predict(batch), max(5, repeats // 10)) * 1e6 / len(batch),
+        "size_kb": len(payload) / 1024,
+        "load_ms": median_time(lambda: joblib.load(io.BytesIO(payload)), 5) * 1e3,
+    }
+
+
+def evaluate(candidates, X_train, X_test, y_train, y_test, score, repeats):
+    """
+    Fits every candidate and returns one report row per candidate.
+    score(y_test, y_pred) -> (error, metrics dict), lower error is better.
+    """
+    rows = []
+    for name, model in candidates.items():
+        start = time.perf_counter()
+        model.fit(X_train, y_train)
+        fit_s = time.perf_counter() - start
+
+        error, metrics = score(y_test, model.predict(X_test))
+
+        row = {"name": name, "model": model, "error": error, "fit_s": fit_s}
+        row.update(metrics)
+        row.update(benchmark(model, X_test, repeats))
+        rows.append(row)
+
+    mark_pareto(rows)
+    return rows
+
+
+def triage_score(y_true, y_pred):
+    f1 = f1_score(y_true, y_pred, average='weighted')
+    return 1 - f1, {"F1": f1}
+
+
+def los_score(y_true, y_pred):
+    mae = mean_absolute_error(y_true, y_pred)
+    return mae, {"MAE": mae, "R2": r2_score(y_true, y_pred)}
+
+
+def mark_pareto(rows, cost_keys=("error", "single_ms")):
+    """
+    Sets row["pareto"]: True if no other row is at least as good on every
+    cost and strictly better on one
+    """
+    for row in rows:
+        row["pareto"] = not any(
+            all(other[k] <= row[k] for k in cost_keys) and any(other[k] < row[k] for k in cost_keys)
+            for other in rows if other is not row
+        )
+
+
+def select(rows, latency_budget_ms):
+    """
+    Most accurate Pareto-optimal candidate within the single-row latency budget.
+    Falls back to the fastest candidate if none fits.
+    """
+    within = [row for row in rows if row["pareto"] and row["single_ms"] <= latency_budget_ms]
+    if within:
+        return min(within, key=lambda row: row["error"])
+
+    print(f"WARNING: no candidate within {latency_budget_ms} ms, using the fastest one.")
+    return min(rows, key=lambda row: row["single_ms"])
+
+
+def print_report(title, rows, metric_keys, chosen):
+    print(f"\n--- {title} ---")
+    header = f"{'':2}{'Model':<28}" + "".join(f"{k:>8}" for k in metric_keys)
+    header += f"{'1-row ms':>10}{'batch us':>10}{'size KB':>10}{'load ms':>9}{'fit s':>8}"
+    print(header)
+
+    for row in sorted(rows, key=lambda row: row["single_ms"]):
+        flag = ">" if row is chosen else ("*" if row["pareto"] else " ")
+        line = f"{flag:<2}{row['name']:<28}" + "".join(f"{row[k]:>8.4f}" for k in metric_keys)
+        line += f"{row['single_ms']:>10.3f}{row['batch_us_per_row']:>10.2f}{row['size_kb']:>10.1f}"
+        line += f"{row['load_ms']:>9.2f}{row['fit_s']:>8.2f}"
+        print(line)
+
+    print("(* Pareto optimal, > selected)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Accuracy vs inference cost model selection.")
+    parser.add_argument("--data", default="data/raw/patients.csv")
+    parser.add_argument("--model-dir", default="src/models/")
+    parser.add_argument("--latency-budget-ms", type=float, default=1.0,
+                        help="Max single-row predict latency of an exported model (default: 1.0)")
+    parser.add_argument("--repeats", type=int, default=50)
+    parser.add_argument("--dry-run", action="store_true", help="Print the report without exporting")
+    args = parser.parse_args()
+
+    X, y_urgency, y_los = load_data(args.data, args.model_dir)
+    X_train, X_test, u_train, u_test, l_train, l_test = train_test_split(
+        X, y_urgency, y_los, test_size=0.2, random_state=0)
+
+    triage = evaluate(triage_candidates(), X_train, X_test, u_train, u_test, triage_score, args.repeats)
+    los = evaluate(los_candidates(), X_train, X_test, l_train, l_test, los_score, args.repeats)
+
+    triage_choice = select(triage, args.latency_budget_ms)
+    los_choice = select(los, args.latency_budget_ms)
+
+    print_report("Triage (classification)", triage, ["F1"], triage_choice)
+    print_report("Length of Stay (regression)", los, ["MAE", "R2"], los_choice)
+
+    if args.dry_run:
+        return
+
+    joblib.dump(triage_choice["model"], os.path.join(args.model_dir, 'triage.pkl'))
+    joblib.dump(los_choice["model"], os.path.join(args.model_dir, 'los.pkl'))
+    print(f"\nExported {triage_choice['name']} -> triage.pkl, {los_choice['name']} -> los.pkl "
+          f"(budget {args.latency_budget_ms} ms)")
+
+    # Keep the numpy-only runtime in sync with the new .pkl files
+    from src.agent.runtime import export_runtime
+    print(f"Exported {export_runtime(args.model_dir)}")
+
+
+if __name__ == "__main__":
+    main()